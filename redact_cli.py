@@ -5,12 +5,25 @@ Redacts sensitive information from PDFs and Word documents.
 """
 
 import argparse
+import heapq
 import os
 import re
 import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
 
+try:
+    import hyperscan  # Optional: multi-pattern DFA scanner
+except ImportError:
+    hyperscan = None
+
+try:
+    import ahocorasick  # Optional: linear-time literal matching for custom terms
+except ImportError:
+    ahocorasick = None
+
 
 @dataclass
 class SensitiveCategory:
@@ -21,6 +34,7 @@ class SensitiveCategory:
     examples: list = field(default_factory=list)
     enabled: bool = True
     use_exact_match: bool = False
+    requires_digit: bool = False  # Every pattern needs a digit to match
 
 
 # Predefined categories with common patterns
@@ -28,8 +42,13 @@ PREDEFINED_CATEGORIES = {
     "ssn": SensitiveCategory(
         name="Social Security Numbers",
         description="US Social Security Numbers (XXX-XX-XXXX format)",
-        patterns=[r'\b\d{3}-\d{2}-\d{4}\b', r'\b\d{9}\b'],
-        examples=["123-45-6789"]
+        patterns=[
+            r'\b\d{3}-\d{2}-\d{4}\b',
+            # Unformatted SSNs: reject area/group/serial values the SSA never issues
+            r'\b(?!000|666|9\d\d)\d{3}(?!00)\d{2}(?!0000)\d{4}\b'
+        ],
+        examples=["123-45-6789"],
+        requires_digit=True
     ),
     "email": SensitiveCategory(
         name="Email Addresses",
@@ -44,66 +63,280 @@ PREDEFINED_CATEGORIES = {
             r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b',
             r'\(\d{3}\)\s*\d{3}[-.\s]?\d{4}\b'
         ],
-        examples=["555-123-4567", "(555) 123-4567"]
+        examples=["555-123-4567", "(555) 123-4567"],
+        requires_digit=True
     ),
     "creditcard": SensitiveCategory(
         name="Credit Card Numbers",
         description="Credit card numbers (13-19 digits)",
         patterns=[r'\b(?:\d{4}[-\s]?){3,4}\d{1,4}\b'],
-        examples=["4111-1111-1111-1111"]
+        examples=["4111-1111-1111-1111"],
+        requires_digit=True
     ),
     "date": SensitiveCategory(
         name="Dates",
         description="Dates in various formats",
+        # Written so that each position has one way forward: the numeric
+        # forms share a prefix and month names are spelled out instead of
+        # trailing [a-z]*, leaving nothing for the engine to backtrack over
         patterns=[
-            r'\b\d{1,2}/\d{1,2}/\d{2,4}\b',
-            r'\b\d{1,2}-\d{1,2}-\d{2,4}\b',
-            r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4}\b'
+            r'\b\d{1,2}(?:/\d{1,2}/|-\d{1,2}-)\d{2,4}\b',
+            r'\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?'
+            r'|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{1,2},?\s+\d{4}\b'
         ],
-        examples=["01/15/2024", "January 15, 2024"]
+        examples=["01/15/2024", "January 15, 2024"],
+        requires_digit=True
     ),
 }
 
 
+def _compile_hyperscan(patterns: list):
+    """Compile patterns into a block-mode Hyperscan database (ids follow list order)."""
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(
+        expressions=[p.encode() for p in patterns],
+        ids=list(range(len(patterns))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(patterns),
+    )
+    return db
+
+
+# ASCII characters str \s matches but bytes \s (and Hyperscan's) doesn't
+_STR_ONLY_SPACE = re.compile("[\x1c-\x1f]")
+
+
+def _fold_case(text: str) -> str:
+    """Lowercase text for literal matching, keeping offsets one-for-one with it."""
+    # str.lower() turns U+0130 into "i" plus a combining dot, the only
+    # character it lengthens; re's IGNORECASE folds it to a plain "i"
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = text.replace("\u0130", "i").lower()
+    return lowered
+
+
+def _match_order(match: tuple) -> tuple:
+    """Sort key for matches: by start, longest first at a shared start."""
+    return match[0], match[0] - match[1]
+
+
+class _PatternScanner:
+    """Finds every match of a fixed set of (pattern, category_name) entries in one pass."""
+
+    def __init__(self, entries: list, use_hyperscan: bool = hyperscan is not None):
+        parts = []
+        part_categories = []
+        hs_patterns = []
+        for pattern, name in entries:
+            try:
+                re.compile(pattern)
+            except re.error:
+                continue
+
+            # Patterns Hyperscan can't handle (e.g. lookbehind) stay on re
+            if use_hyperscan:
+                try:
+                    _compile_hyperscan([pattern])
+                except hyperscan.error:
+                    pass
+                else:
+                    hs_patterns.append(pattern)
+                    continue
+
+            parts.append(f"(?P<g{len(parts)}>{pattern})")
+            part_categories.append(name)
+
+        self.combined = re.compile("|".join(parts), re.IGNORECASE) if parts else None
+
+        # Bytes twin of the union for ASCII text: sre skips Unicode case
+        # folding on bytes, and offsets line up with the str one-for-one
+        self.combined_bytes = None
+        if self.combined is not None and self.combined.pattern.isascii():
+            self.combined_bytes = re.compile(self.combined.pattern.encode("ascii"), re.IGNORECASE)
+        self.hs_db = _compile_hyperscan(hs_patterns) if hs_patterns else None
+        # Hyperscan reports every match rather than re's leftmost-first ones,
+        # so it only narrows down where the twin's union of every pattern is
+        # tried. Its \s, \b and case folding are ASCII-only, so other text
+        # goes to the twin outright
+        self.re_only = _PatternScanner(entries, use_hyperscan=False) if hs_patterns else None
+
+        # Category names by the group index match.lastindex reports (the
+        # outer group closes last, so capturing groups inside a pattern
+        # don't shift it)
+        group_categories = [None] * (self.combined.groups + 1 if self.combined else 0)
+        if self.combined is not None:
+            for i, name in enumerate(part_categories):
+                group_categories[self.combined.groupindex[f"g{i}"]] = name
+        self.group_categories = tuple(group_categories)
+
+    def _hyperscan_spans(self, buf: bytes) -> list:
+        """Return sorted, disjoint [start, end] runs of buf holding every Hyperscan match."""
+        hits = []
+
+        def on_match(pattern_id, start, end, flags, context):
+            hits.append((start, end))
+
+        self.hs_db.scan(buf, match_event_handler=on_match)
+
+        # Each reported match is the leftmost one for its end offset, so any
+        # other match ending there lies inside it
+        hits.sort()
+        spans = []
+        for start, end in hits:
+            if spans and start < spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([start, end])
+        return spans
+
+    def _scan_union(self, text: str, buf: bytes) -> list:
+        """Return what finditer over the twin's union yields on buf (text as ASCII bytes)."""
+        # The union is only tried where a match can start: inside a
+        # Hyperscan span, or where one of the patterns left on re matches
+        union = self.re_only.combined_bytes
+        categories = self.re_only.group_categories
+        rest = self.combined_bytes
+        spans = self._hyperscan_spans(buf)
+        matches = []
+        pos = 0
+        index = 0
+        next_rest = rest.search(buf) if rest is not None else None
+        while True:
+            while index < len(spans) and spans[index][1] <= pos:
+                index += 1
+            if next_rest is not None and next_rest.start() < pos:
+                next_rest = rest.search(buf, pos)
+            limit = next_rest.start() if next_rest is not None else len(buf)
+            match = None
+            if index < len(spans):
+                start, end = spans[index]
+                for at in range(max(pos, start), min(end, limit)):
+                    match = union.match(buf, at)
+                    if match:
+                        break
+                if match is None and limit >= end:
+                    pos = end
+                    continue
+            if match is None:
+                if next_rest is None:
+                    return matches
+                # The re pattern matching here makes the union match too
+                match = union.match(buf, limit)
+            start, end = match.span()
+            matches.append((start, end, text[start:end], categories[match.lastindex]))
+            pos = end
+
+    def scan(self, text: str) -> list:
+        """Return matches in order and without overlaps, as finditer over the union yields them."""
+        # Byte engines only agree with re on ASCII text without \x1c-\x1f.
+        # Other text stays on the str union so \s, \b and \w keep their
+        # Unicode meaning
+        ascii_text = text.isascii() and not _STR_ONLY_SPACE.search(text)
+        if self.re_only is not None:
+            if ascii_text and self.re_only.combined_bytes is not None:
+                return self._scan_union(text, text.encode("ascii"))
+            return self.re_only.scan(text)
+        matches = []
+        buf = text.encode("ascii") if ascii_text else None
+
+        # Single pass over the text for all patterns left on re; finditer
+        # already yields them in order and without overlaps
+        if self.combined is not None:
+            if ascii_text and self.combined_bytes is not None:
+                for match in self.combined_bytes.finditer(buf):
+                    start, end = match.span()
+                    matches.append((start, end, text[start:end], self.group_categories[match.lastindex]))
+            else:
+                for match in self.combined.finditer(text):
+                    matches.append((match.start(), match.end(), match.group(), self.group_categories[match.lastindex]))
+
+        return matches
+
+
+# Cheap C-level test that lets digit-only categories be skipped entirely
+_DIGIT = re.compile(r"\d")
+
+
 class SensitiveInfoDetector:
     """Detects sensitive information in text based on configured categories."""
 
     def __init__(self):
         self.categories = {}
         self.custom_terms = []
+        self._scanner = None
+        self._text_scanner = None
+        self._custom_words = ()
+        self._custom_automaton = None
+        self._stale = True
 
     def add_category(self, key: str, category: SensitiveCategory):
         self.categories[key] = category
+        self._stale = True
 
     def set_custom_terms(self, terms: list):
         self.custom_terms = [t.strip() for t in terms if t.strip()]
-
-    def find_sensitive_text(self, text: str) -> list:
-        """Find all sensitive text matches. Returns list of (start, end, matched_text, category_name)."""
+        self._custom_words = tuple(dict.fromkeys(_fold_case(t) for t in self.custom_terms))
+        self._custom_automaton = None
+        if self._custom_words and ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for word in self._custom_words:
+                automaton.add_word(word, len(word))
+            automaton.make_automaton()
+            self._custom_automaton = automaton
+
+    def _find_custom_terms(self, text: str) -> list:
+        """Find every occurrence of every custom term, overlapping ones included."""
+        # The overlap sweep in find_sensitive_text picks among them; without
+        # pyahocorasick each term is found with str.find instead
+        lowered = _fold_case(text)
         matches = []
-
+        if self._custom_automaton is not None:
+            for end_index, length in self._custom_automaton.iter(lowered):
+                start = end_index - length + 1
+                matches.append((start, end_index + 1, text[start:end_index + 1], "Custom Terms"))
+        else:
+            for word in self._custom_words:
+                start = lowered.find(word)
+                while start != -1:
+                    matches.append((start, start + len(word), text[start:start + len(word)], "Custom Terms"))
+                    start = lowered.find(word, start + 1)
+        # The automaton reports in end order, str.find term by term
+        matches.sort(key=_match_order)
+        return matches
+
+    def finalize(self):
+        """Compile scanners for the enabled categories only, once configuration is complete."""
+        entries = []
+        text_entries = []
         for key, category in self.categories.items():
             if not category.enabled:
                 continue
-
             for pattern in category.patterns:
-                try:
-                    for match in re.finditer(pattern, text, re.IGNORECASE):
-                        matches.append((match.start(), match.end(), match.group(), category.name))
-                except re.error:
-                    continue
+                entries.append((pattern, category.name))
+                if not category.requires_digit:
+                    text_entries.append((pattern, category.name))
+
+        self._scanner = _PatternScanner(entries)
+        # Most PDF spans and many paragraphs contain no digits at all
+        self._text_scanner = _PatternScanner(text_entries)
+        self._stale = False
+
+    def find_sensitive_text(self, text: str) -> list:
+        """Find all sensitive text matches. Returns list of (start, end, matched_text, category_name)."""
+        if self._stale:
+            self.finalize()
+
+        scanner = self._scanner if _DIGIT.search(text) else self._text_scanner
+        matches = scanner.scan(text)
 
         # Custom terms (exact match)
-        for term in self.custom_terms:
-            escaped = re.escape(term)
-            try:
-                for match in re.finditer(escaped, text, re.IGNORECASE):
-                    matches.append((match.start(), match.end(), match.group(), "Custom Terms"))
-            except re.error:
-                continue
+        if self._custom_words:
+            custom_matches = self._find_custom_terms(text)
+            if custom_matches:
+                matches = heapq.merge(matches, custom_matches, key=_match_order)
 
-        # Remove overlapping matches
-        matches.sort(key=lambda x: (x[0], -(x[1] - x[0])))
+        # Both sources are already ordered, so a single sweep removes
+        # overlapping matches (keeping the earliest, then longest)
         filtered = []
         last_end = -1
         for match in matches:
@@ -114,36 +347,131 @@ class SensitiveInfoDetector:
         return filtered
 
 
-def redact_pdf(input_path: str, output_path: str, detector: SensitiveInfoDetector) -> dict:
+# Detectors keyed by (category keys, custom terms), so callers that run many
+# documents in one process compile each configuration only once
+_DETECTOR_CACHE = {}
+
+
+def get_detector(categories: tuple, custom_terms: tuple = ()) -> SensitiveInfoDetector:
+    """Return a detector for predefined category keys and custom terms, reusing a cached one."""
+    key = (categories, custom_terms)
+    detector = _DETECTOR_CACHE.get(key)
+    if detector is None:
+        detector = SensitiveInfoDetector()
+        for cat_key in categories:
+            detector.add_category(cat_key, PREDEFINED_CATEGORIES[cat_key])
+        detector.set_custom_terms(list(custom_terms))
+        detector.finalize()
+        _DETECTOR_CACHE[key] = detector
+    return detector
+
+
+# Compile the default (all categories, no custom terms) configuration at
+# import, so the CLI and pool workers start with its scanners ready
+get_detector(tuple(PREDEFINED_CATEGORIES))
+
+
+# Joins PDF lines or DOCX paragraphs for a single detector pass; no pattern
+# or custom term can match across a NUL, so matches never straddle two
+_TEXT_SEPARATOR = "\x00"
+
+
+def _scan_page(page, detector: SensitiveInfoDetector) -> list:
+    """Return (rect, category) pairs for every sensitive match on a PDF page."""
+    import fitz
+
+    # Flatten the page's rawdict into one string with a parallel list of
+    # glyph boxes, so the detector runs once per page and each match maps
+    # straight to its glyphs without re-searching the page
+    pieces = []
+    boxes = []
+    for block in page.get_text("rawdict").get("blocks", []):
+        if block.get("type") != 0:
+            continue
+
+        for line in block.get("lines", []):
+            for span in line.get("spans", []):
+                for char in span.get("chars", []):
+                    pieces.append(char["c"])
+                    boxes.extend([char["bbox"]] * len(char["c"]))
+            pieces.append(_TEXT_SEPARATOR)
+            boxes.append(None)
+
+    hits = []
+    for start, end, matched_text, category in detector.find_sensitive_text("".join(pieces)):
+        rect = fitz.Rect(boxes[start])
+        for bbox in boxes[start + 1:end]:
+            rect |= bbox
+        hits.append((rect, category))
+
+    return hits
+
+
+# Per-process state for the page-scanning pool, set up once by the initializer
+_worker_state = {}
+
+
+def _init_page_worker(input_path: str, categories: dict, custom_terms: list):
+    import fitz
+
+    if all(PREDEFINED_CATEGORIES.get(key) == category for key, category in categories.items()):
+        # Reuses the scanners compiled at import for the default configuration
+        detector = get_detector(tuple(categories), tuple(custom_terms))
+    else:
+        detector = SensitiveInfoDetector()
+        for key, category in categories.items():
+            detector.add_category(key, category)
+        detector.set_custom_terms(custom_terms)
+
+    _worker_state["doc"] = fitz.open(input_path)
+    _worker_state["detector"] = detector
+
+
+def _scan_page_worker(page_no: int) -> list:
+    page = _worker_state["doc"][page_no]
+    hits = _scan_page(page, _worker_state["detector"])
+    return [(tuple(rect), category) for rect, category in hits]
+
+
+def _scan_pages_parallel(input_path: str, page_count: int, detector: SensitiveInfoDetector, workers: int) -> list:
+    """Scan all pages in worker processes. Returns one hit list per page, in page order."""
+    # Workers open the file themselves, so no copy of the PDF is pickled to
+    # each one, and rebuild the detector from its plain config; compiled
+    # scanners don't pickle
+    initargs = (input_path, detector.categories, detector.custom_terms)
+    chunksize = max(1, page_count // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker, initargs=initargs) as executor:
+        return list(executor.map(_scan_page_worker, range(page_count), chunksize=chunksize))
+
+
+def redact_pdf(input_path: str, output_path: str, detector: SensitiveInfoDetector, workers: int = 1) -> dict:
     """Redact sensitive information from a PDF."""
     import fitz
 
     doc = fitz.open(input_path)
     stats = {"pages": 0, "redactions": 0, "categories": {}}
 
+    parallel_hits = None
+    if workers > 1 and doc.page_count > 1:
+        parallel_hits = _scan_pages_parallel(input_path, doc.page_count, detector, workers)
+
     for page in doc:
         stats["pages"] += 1
-        text_dict = page.get_text("dict")
 
-        for block in text_dict.get("blocks", []):
-            if block.get("type") != 0:
-                continue
-
-            for line in block.get("lines", []):
-                for span in line.get("spans", []):
-                    text = span.get("text", "")
-                    if not text:
-                        continue
+        if parallel_hits is not None:
+            hits = parallel_hits[page.number]
+        else:
+            hits = _scan_page(page, detector)
 
-                    matches = detector.find_sensitive_text(text)
-                    for start, end, matched_text, category in matches:
-                        instances = page.search_for(matched_text)
-                        for inst in instances:
-                            page.add_redact_annot(inst, fill=(0, 0, 0))
-                            stats["redactions"] += 1
-                            stats["categories"][category] = stats["categories"].get(category, 0) + 1
+        for rect, category in hits:
+            page.add_redact_annot(rect, fill=(0, 0, 0))
+            stats["redactions"] += 1
+            stats["categories"][category] = stats["categories"].get(category, 0) + 1
 
-        page.apply_redactions()
+        # Content-stream rewriting is wasted on pages with nothing to redact
+        if hits:
+            page.apply_redactions()
 
     doc.save(output_path)
     doc.close()
@@ -153,54 +481,79 @@ def redact_pdf(input_path: str, output_path: str, detector: SensitiveInfoDetecto
 def redact_docx(input_path: str, output_path: str, detector: SensitiveInfoDetector) -> dict:
     """Redact sensitive information from a Word document."""
     from docx import Document
+    from docx.text.hyperlink import Hyperlink
 
     doc = Document(input_path)
     stats = {"paragraphs": 0, "redactions": 0, "categories": {}}
 
-    def process_paragraph(para):
-        full_text = para.text
-        if not full_text:
-            return
-
-        matches = detector.find_sensitive_text(full_text)
-        if not matches:
-            return
-
-        new_text = list(full_text)
+    def process_paragraph(para, full_text, matches):
+        # Matches are sorted and non-overlapping, so splice slices together;
+        # each match is replaced char for char, so offsets are unchanged
+        parts = []
+        cursor = 0
         for start, end, matched_text, category in matches:
-            for i in range(start, end):
-                new_text[i] = "█"
+            parts.append(full_text[cursor:start])
+            parts.append("█" * (end - start))
+            cursor = end
             stats["redactions"] += 1
             stats["categories"][category] = stats["categories"].get(category, 0) + 1
+        parts.append(full_text[cursor:])
 
-        new_text = "".join(new_text)
+        new_text = "".join(parts)
 
-        if para.runs:
-            first_run = para.runs[0]
-            font_name = first_run.font.name
-            font_size = first_run.font.size
-            bold = first_run.font.bold
-            italic = first_run.font.italic
+        # Runs (including those inside hyperlinks) in the order para.text joins them
+        runs = []
+        for item in para.iter_inner_content():
+            runs.extend(item.runs if isinstance(item, Hyperlink) else [item])
 
-            for run in para.runs:
-                run.text = ""
+        run_starts = []
+        offset = 0
+        for run in runs:
+            run_starts.append(offset)
+            offset += len(run.text)
+        run_starts.append(offset)
 
-            para.runs[0].text = new_text
-            para.runs[0].font.name = font_name
-            para.runs[0].font.size = font_size
-            para.runs[0].font.bold = bold
-            para.runs[0].font.italic = italic
+        # Rewrite only the runs a match touches, leaving their formatting alone
+        touched = set()
+        for start, end, matched_text, category in matches:
+            index = bisect_right(run_starts, start) - 1
+            while index < len(runs) and run_starts[index] < end:
+                touched.add(index)
+                index += 1
 
-    for para in doc.paragraphs:
-        stats["paragraphs"] += 1
-        process_paragraph(para)
+        for index in touched:
+            runs[index].text = new_text[run_starts[index]:run_starts[index + 1]]
 
+    all_paras = list(doc.paragraphs)
     for table in doc.tables:
         for row in table.rows:
             for cell in row.cells:
-                for para in cell.paragraphs:
-                    stats["paragraphs"] += 1
-                    process_paragraph(para)
+                all_paras.extend(cell.paragraphs)
+    stats["paragraphs"] = len(all_paras)
+
+    # Merged table cells yield the same paragraph more than once; scan it once
+    paragraphs = []
+    seen = set()
+    for para in all_paras:
+        if para._p not in seen:
+            seen.add(para._p)
+            paragraphs.append(para)
+
+    texts = [para.text for para in paragraphs]
+    offsets = []
+    offset = 0
+    for text in texts:
+        offsets.append(offset)
+        offset += len(text) + len(_TEXT_SEPARATOR)
+
+    by_paragraph = {}
+    for start, end, matched_text, category in detector.find_sensitive_text(_TEXT_SEPARATOR.join(texts)):
+        index = bisect_right(offsets, start) - 1
+        base = offsets[index]
+        by_paragraph.setdefault(index, []).append((start - base, end - base, matched_text, category))
+
+    for index, matches in by_paragraph.items():
+        process_paragraph(paragraphs[index], texts[index], matches)
 
     doc.save(output_path)
     return stats
@@ -210,45 +563,48 @@ def preview_document(file_path: str, detector: SensitiveInfoDetector):
     """Preview what would be redacted."""
     ext = Path(file_path).suffix.lower()
 
+    # Group by category as text is scanned, so PDFs never need their
+    # full text held in memory at once
+    by_category = {}
+    total = 0
+
+    def collect(text):
+        nonlocal total
+        for start, end, matched_text, category in detector.find_sensitive_text(text):
+            if category not in by_category:
+                by_category[category] = []
+            by_category[category].append(matched_text)
+            total += 1
+
     if ext == ".pdf":
         import fitz
         doc = fitz.open(file_path)
-        text = ""
         for page in doc:
-            text += page.get_text() + "\n"
+            collect(page.get_text())
         doc.close()
     elif ext == ".docx":
         from docx import Document
         doc = Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs])
+        collect("\n".join([para.text for para in doc.paragraphs]))
     else:
         print(f"Error: Unsupported file type: {ext}")
         sys.exit(1)
 
-    matches = detector.find_sensitive_text(text)
-
     print("\n" + "="*60)
     print("PREVIEW: Items that will be redacted")
     print("="*60 + "\n")
 
-    if not matches:
+    if not total:
         print("No sensitive information found.")
         return
 
-    # Group by category
-    by_category = {}
-    for start, end, matched_text, category in matches:
-        if category not in by_category:
-            by_category[category] = []
-        by_category[category].append(matched_text)
-
     for category, items in by_category.items():
         print(f"\n{category}:")
         for item in items:
             print(f"  • {item}")
 
     print(f"\n{'='*60}")
-    print(f"Total: {len(matches)} items to redact")
+    print(f"Total: {total} items to redact")
     print("="*60)
 
 
@@ -273,6 +629,9 @@ Examples:
   # Specify output file name
   python3 redact_cli.py document.pdf -o redacted_output.pdf
 
+  # Scan a large PDF's pages with 4 worker processes
+  python3 redact_cli.py document.pdf -j 4
+
 Available categories: ssn, email, phone, creditcard, date
         """
     )
@@ -292,6 +651,12 @@ Available categories: ssn, email, phone, creditcard, date
         default=[],
         help="Custom terms/names to redact"
     )
+    parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for scanning PDF pages (default: 1)"
+    )
     parser.add_argument(
         "--preview",
         action="store_true",
@@ -312,17 +677,11 @@ Available categories: ssn, email, phone, creditcard, date
         sys.exit(1)
 
     # Setup detector
-    detector = SensitiveInfoDetector()
-
     categories_to_use = args.categories
     if "all" in categories_to_use:
         categories_to_use = list(PREDEFINED_CATEGORIES.keys())
 
-    for cat_key in categories_to_use:
-        detector.add_category(cat_key, PREDEFINED_CATEGORIES[cat_key])
-
-    if args.custom:
-        detector.set_custom_terms(args.custom)
+    detector = get_detector(tuple(categories_to_use), tuple(args.custom))
 
     print(f"\nProcessing: {args.input}")
     print(f"Categories: {', '.join(categories_to_use)}")
@@ -346,7 +705,7 @@ Available categories: ssn, email, phone, creditcard, date
 
     try:
         if ext == ".pdf":
-            stats = redact_pdf(args.input, output_path, detector)
+            stats = redact_pdf(args.input, output_path, detector, workers=args.workers)
         else:
             stats = redact_docx(args.input, output_path, detector)
 
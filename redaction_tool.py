@@ -6,8 +6,12 @@ Redacts sensitive information from PDFs and Word documents.
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
+import heapq
 import os
 import re
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional
@@ -15,10 +19,21 @@ import fitz  # PyMuPDF
 from docx import Document
 from docx.shared import RGBColor, Pt
 from docx.oxml.ns import qn
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
 from docx.oxml import OxmlElement
 import tempfile
 import shutil
 
+try:
+    import ahocorasick  # Optional: linear-time literal matching for exact examples
+except ImportError:
+    ahocorasick = None
+
+try:
+    import pypdfium2  # Optional: lighter text extraction for PDF previews
+except ImportError:
+    pypdfium2 = None
+
 
 @dataclass
 class SensitiveCategory:
@@ -29,6 +44,9 @@ class SensitiveCategory:
     examples: list = field(default_factory=list)
     enabled: bool = True
     use_exact_match: bool = False  # If True, only match exact examples
+    requires_digit: bool = False  # If True, every pattern needs a digit to match
+    ascii_only: bool = False  # If True, \d and \w only match ASCII digits and letters
+    luhn_check: bool = False  # If True, matches must pass the Luhn checksum
 
 
 # Predefined categories with common patterns
@@ -36,14 +54,22 @@ PREDEFINED_CATEGORIES = {
     "SSN": SensitiveCategory(
         name="Social Security Numbers",
         description="US Social Security Numbers (XXX-XX-XXXX format)",
-        patterns=[r'\b\d{3}-\d{2}-\d{4}\b', r'\b\d{9}\b'],
-        examples=["123-45-6789"]
+        patterns=[
+            r'\b\d{3}-\d{2}-\d{4}\b',
+            # Unformatted SSNs: not part of a dashed number, and no area,
+            # group or serial value the SSA never issues
+            r'(?<!-)\b(?!000|666|9\d\d)\d{3}(?!00)\d{2}(?!0000)\d{4}\b(?!-)'
+        ],
+        examples=["123-45-6789"],
+        requires_digit=True,
+        ascii_only=True
     ),
     "Email": SensitiveCategory(
         name="Email Addresses",
         description="Email addresses",
         patterns=[r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'],
-        examples=["example@email.com"]
+        examples=["example@email.com"],
+        ascii_only=True
     ),
     "Phone": SensitiveCategory(
         name="Phone Numbers",
@@ -52,13 +78,18 @@ PREDEFINED_CATEGORIES = {
             r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b',
             r'\(\d{3}\)\s*\d{3}[-.\s]?\d{4}\b'
         ],
-        examples=["555-123-4567", "(555) 123-4567"]
+        examples=["555-123-4567", "(555) 123-4567"],
+        requires_digit=True,
+        ascii_only=True
     ),
     "CreditCard": SensitiveCategory(
         name="Credit Card Numbers",
         description="Credit card numbers (13-19 digits)",
         patterns=[r'\b(?:\d{4}[-\s]?){3,4}\d{1,4}\b'],
-        examples=["4111-1111-1111-1111"]
+        examples=["4111-1111-1111-1111"],
+        requires_digit=True,
+        ascii_only=True,
+        luhn_check=True
     ),
     "Date": SensitiveCategory(
         name="Dates",
@@ -68,7 +99,9 @@ PREDEFINED_CATEGORIES = {
             r'\b\d{1,2}-\d{1,2}-\d{2,4}\b',
             r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4}\b'
         ],
-        examples=["01/15/2024", "January 15, 2024"]
+        examples=["01/15/2024", "January 15, 2024"],
+        requires_digit=True,
+        ascii_only=True
     ),
     "Custom": SensitiveCategory(
         name="Custom Terms",
@@ -80,67 +113,260 @@ PREDEFINED_CATEGORIES = {
 }
 
 
+# ASCII spellings of \d and \w, outside and inside a character class. \s and
+# \b stay Unicode, so NBSP-separated numbers still match and a match can't
+# start right after a non-ASCII letter
+_ASCII_CLASSES = {
+    "d": ("[0-9]", "0-9"),
+    "D": ("[^0-9]", None),
+    "w": ("[a-zA-Z0-9_]", "a-zA-Z0-9_"),
+    "W": ("[^a-zA-Z0-9_]", None),
+}
+
+
+def _ascii_classes(pattern: str) -> str:
+    """Rewrite \d and \w in a pattern as explicit ASCII classes."""
+    out = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            escape = pattern[i + 1]
+            spellings = _ASCII_CLASSES.get(escape)
+            replacement = spellings and spellings[in_class]
+            out.append(replacement or pattern[i:i + 2])
+            i += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # A ']' right after '[' or '[^' is a literal member
+            out.append(char)
+            i += 1
+            if pattern.startswith("^", i):
+                out.append("^")
+                i += 1
+            if pattern.startswith("]", i):
+                out.append("]")
+                i += 1
+            continue
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def _fold_case(text: str) -> str:
+    """Lowercase text for literal matching, keeping offsets one-for-one with it."""
+    # str.lower() turns U+0130 into "i" plus a combining dot, the only
+    # character it lengthens; re's IGNORECASE folds it to a plain "i"
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = text.replace("\u0130", "i").lower()
+    return lowered
+
+
+def _match_order(match: tuple) -> tuple:
+    """Sort key for matches: by start, longest first at a shared start."""
+    return match[0], match[0] - match[1]
+
+
+# Luhn contribution of a digit in a doubled position (doubled, digits summed)
+_LUHN_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+_NON_DIGIT = re.compile(r"\D")
+
+
+def _luhn_valid(number: str) -> bool:
+    """Check a card number's Luhn checksum, ignoring separators."""
+    digits = _NON_DIGIT.sub("", number)
+    if not 13 <= len(digits) <= 19:
+        return False
+    # From the right: every other digit as is, the ones between doubled
+    total = sum(map(int, digits[-1::-2])) + sum(_LUHN_DOUBLED[int(d)] for d in digits[-2::-2])
+    return total % 10 == 0
+
+
+# Cheap C-level test that lets digit-only categories be skipped entirely
+_DIGIT = re.compile(r"\d")
+
+# ASCII characters str \s matches but bytes \s doesn't, so ASCII text holding
+# them can't use the unions' bytes twins
+_STR_ONLY_SPACE = re.compile("[\x1c-\x1f]")
+
+
 class SensitiveInfoDetector:
     """Detects sensitive information in text based on configured categories."""
 
     def __init__(self):
         self.categories = {}
+        self._union = None
+        self._text_union = None
+        self._exact_words = ()
+        self._bytes_unions = {}
+        self._exact_automaton = None
+        self._luhn_categories = frozenset()
+        self._group_tables = {}
+        self._stale = True
 
     def add_category(self, key: str, category: SensitiveCategory):
         """Add a category of sensitive information to detect."""
         self.categories[key] = category
+        self._invalidate()
 
     def remove_category(self, key: str):
         """Remove a category."""
         if key in self.categories:
             del self.categories[key]
+            self._invalidate()
 
-    def find_sensitive_text(self, text: str) -> list:
-        """
-        Find all sensitive text matches in the given text.
-        Returns list of (start, end, matched_text, category_name) tuples.
-        """
-        matches = []
+    def set_enabled(self, key: str, enabled: bool):
+        """Enable or disable a category."""
+        if key in self.categories:
+            self.categories[key].enabled = enabled
+            self._invalidate()
+
+    def _invalidate(self):
+        """Mark the compiled unions out of date after any configuration change."""
+        self._stale = True
+
+    def _rebuild_union(self):
+        """Compile every enabled pattern into one alternation, and collect exact examples as words."""
+        parts = []
+        text_parts = []
+        exact_words = {}
+        group_names = {}
+        luhn_categories = set()
 
         for key, category in self.categories.items():
             if not category.enabled:
                 continue
 
-            # Match against patterns
+            if category.luhn_check:
+                luhn_categories.add(category.name)
+
             for pattern in category.patterns:
                 try:
-                    for match in re.finditer(pattern, text, re.IGNORECASE):
-                        matches.append((
-                            match.start(),
-                            match.end(),
-                            match.group(),
-                            category.name
-                        ))
+                    re.compile(pattern)
                 except re.error:
                     continue
-
-            # Match exact examples if use_exact_match is True
+                # Non-Latin digits don't count as SSN or phone digits
+                if category.ascii_only:
+                    pattern = _ascii_classes(pattern)
+                group = f"g{len(group_names)}"
+                part = f"(?P<{group}>{pattern})"
+                parts.append(part)
+                if not category.requires_digit:
+                    text_parts.append(part)
+                group_names[group] = category.name
+
+            # Match exact examples if use_exact_match is True, as literal
+            # words compared case-insensitively
             if category.use_exact_match:
                 for example in category.examples:
                     if example.strip():
-                        # Escape special regex characters for literal matching
-                        escaped = re.escape(example)
-                        try:
-                            for match in re.finditer(escaped, text, re.IGNORECASE):
-                                matches.append((
-                                    match.start(),
-                                    match.end(),
-                                    match.group(),
-                                    category.name
-                                ))
-                        except re.error:
-                            continue
-
-        # Remove overlapping matches (keep longer ones)
-        matches.sort(key=lambda x: (x[0], -(x[1] - x[0])))
+                        lowered = _fold_case(example)
+                        exact_words.setdefault(lowered, []).append((len(lowered), category.name))
+
+        self._union = re.compile("|".join(parts), re.IGNORECASE) if parts else None
+        # Most PDF spans contain no digits at all, and can skip the numeric categories
+        self._text_union = re.compile("|".join(text_parts), re.IGNORECASE) if text_parts else None
+
+        # Per union, category names as a flat tuple indexed by the group
+        # number match.lastindex reports (the outer group closes last, so
+        # groups inside a pattern don't shift it)
+        self._group_tables = {}
+        for union in (self._union, self._text_union):
+            if union is not None:
+                table = [None] * (union.groups + 1)
+                for group, index in union.groupindex.items():
+                    table[index] = group_names[group]
+                self._group_tables[union] = tuple(table)
+        self._luhn_categories = frozenset(luhn_categories)
+
+        # Bytes twins of the ASCII-only unions, for ASCII text: sre skips
+        # Unicode case folding on bytes, and offsets line up one-for-one
+        self._bytes_unions = {}
+        for union in (self._union, self._text_union):
+            if union is not None and union.pattern.isascii():
+                self._bytes_unions[union] = re.compile(union.pattern.encode("ascii"), re.IGNORECASE)
+
+        # Without pyahocorasick the words are found with str.find instead
+        self._exact_words = tuple((word, tuple(entries)) for word, entries in exact_words.items())
+        self._exact_automaton = None
+        if exact_words and ahocorasick is not None:
+            self._exact_automaton = ahocorasick.Automaton()
+            for word, entries in self._exact_words:
+                self._exact_automaton.add_word(word, entries)
+            self._exact_automaton.make_automaton()
+        self._stale = False
+
+    def _find_exact_examples(self, text: str) -> list:
+        """Find every occurrence of every exact example, overlapping ones included."""
+        lowered = _fold_case(text)
+        matches = []
+        if self._exact_automaton is not None:
+            for end_index, entries in self._exact_automaton.iter(lowered):
+                for length, name in entries:
+                    start = end_index - length + 1
+                    matches.append((start, end_index + 1, text[start:end_index + 1], name))
+        else:
+            for word, entries in self._exact_words:
+                start = lowered.find(word)
+                while start != -1:
+                    for length, name in entries:
+                        matches.append((start, start + length, text[start:start + length], name))
+                    start = lowered.find(word, start + 1)
+        return matches
+
+    def _union_matches(self, union, text: str) -> list:
+        """Run one of the unions over text, on its bytes twin when the text is ASCII."""
+        categories = self._group_tables[union]
+        union_bytes = self._bytes_unions.get(union)
+        if union_bytes is not None and text.isascii() and not _STR_ONLY_SPACE.search(text):
+            matches = []
+            for match in union_bytes.finditer(text.encode("ascii")):
+                start, end = match.span()
+                matches.append((start, end, text[start:end], categories[match.lastindex]))
+            return matches
+
+        return [(m.start(), m.end(), m.group(), categories[m.lastindex])
+                for m in union.finditer(text)]
+
+    def find_sensitive_text(self, text: str) -> list:
+        """
+        Find all sensitive text matches in the given text.
+        Returns list of (start, end, matched_text, category_name) tuples.
+        """
+        if self._stale:
+            self._rebuild_union()
+
+        # One pass over the text for every enabled category pattern
+        matches = []
+        union = self._union if _DIGIT.search(text) else self._text_union
+        if union is not None:
+            matches = self._union_matches(union, text)
+
+        # Digit runs that fail the checksum aren't card numbers
+        if self._luhn_categories and matches:
+            matches = [m for m in matches if m[3] not in self._luhn_categories or _luhn_valid(m[2])]
+
+        # The union's matches are already in order and never overlap, so only
+        # exact examples (which may nest or overlap) need sorting and merging
+        if not self._exact_words:
+            return matches
+        exact_matches = self._find_exact_examples(text)
+        if not exact_matches:
+            return matches
+        exact_matches.sort(key=_match_order)
+        merged = heapq.merge(matches, exact_matches, key=_match_order)
+
+        # Remove overlapping matches (keep longer ones) in a single sweep
         filtered = []
         last_end = -1
-        for match in matches:
+        for match in merged:
             if match[0] >= last_end:
                 filtered.append(match)
                 last_end = match[1]
@@ -148,11 +374,60 @@ class SensitiveInfoDetector:
         return filtered
 
 
+# Joins PDF lines or Word paragraphs for a single detector pass. NUL, unlike
+# the ASCII record separators, isn't matched by \s, so no pattern or exact
+# example can match across it and matches never straddle two
+_TEXT_SEPARATOR = "\x00"
+
+
 class PDFRedactor:
     """Handles PDF document redaction."""
 
-    def __init__(self, detector: SensitiveInfoDetector):
+    def __init__(self, detector: SensitiveInfoDetector, workers: int = 1):
         self.detector = detector
+        self.workers = workers
+
+    def scan_page(self, page) -> list:
+        """Find the sensitive text on a page. Returns list of (rect, category_name) tuples."""
+        # Flatten the page's rawdict into one string with a parallel list of
+        # glyph boxes, so the detector runs once per page and each match maps
+        # straight to its glyphs without re-searching the page
+        pieces = []
+        boxes = []
+        for block in page.get_text("rawdict").get("blocks", []):
+            if block.get("type") != 0:  # Not a text block
+                continue
+
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    for char in span.get("chars", []):
+                        pieces.append(char["c"])
+                        boxes.extend([char["bbox"]] * len(char["c"]))
+                pieces.append(_TEXT_SEPARATOR)
+                boxes.append(None)
+
+        hits = []
+        for start, end, matched_text, category in self.detector.find_sensitive_text("".join(pieces)):
+            # Cover the matched glyphs
+            rect = fitz.Rect(boxes[start])
+            for bbox in boxes[start + 1:end]:
+                rect |= bbox
+            hits.append((rect, category))
+
+        return hits
+
+    def _scan_pages_parallel(self, input_path: str, page_count: int):
+        """Scan all pages in worker processes. Yields one hit list per page, in page order."""
+        # Workers rebuild the detector from its categories; the compiled
+        # union doesn't pickle
+        initargs = (input_path, self.detector.categories)
+        chunksize = max(1, page_count // (self.workers * 4))
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_page_worker,
+                                 initargs=initargs) as executor:
+            # Results are handed over as each chunk finishes, so the caller
+            # applies earlier pages while workers are still scanning later ones
+            yield from executor.map(_scan_page_worker, range(page_count), chunksize=chunksize)
 
     def redact(self, input_path: str, output_path: str) -> dict:
         """
@@ -162,43 +437,68 @@ class PDFRedactor:
         doc = fitz.open(input_path)
         stats = {"pages": 0, "redactions": 0, "categories": {}}
 
+        # Scanning is the CPU-bound part, so it is spread over processes;
+        # annotations are applied here since the document can't be shared
+        parallel_hits = None
+        if self.workers > 1 and doc.page_count >= _PARALLEL_MIN_PAGES:
+            parallel_hits = self._scan_pages_parallel(input_path, doc.page_count)
+
         for page_num, page in enumerate(doc):
             stats["pages"] += 1
-            text_dict = page.get_text("dict")
-
-            # Process each text block
-            for block in text_dict.get("blocks", []):
-                if block.get("type") != 0:  # Not a text block
-                    continue
 
-                for line in block.get("lines", []):
-                    for span in line.get("spans", []):
-                        text = span.get("text", "")
-                        if not text:
-                            continue
-
-                        matches = self.detector.find_sensitive_text(text)
-
-                        for start, end, matched_text, category in matches:
-                            # Find the position of this text on the page
-                            instances = page.search_for(matched_text)
+            if parallel_hits is not None:
+                hits = next(parallel_hits)
+            else:
+                hits = self.scan_page(page)
 
-                            for inst in instances:
-                                # Add redaction annotation
-                                page.add_redact_annot(inst, fill=(0, 0, 0))
-                                stats["redactions"] += 1
-                                stats["categories"][category] = stats["categories"].get(category, 0) + 1
+            for rect, category in hits:
+                # Add redaction annotation
+                page.add_redact_annot(rect, fill=(0, 0, 0))
+                stats["redactions"] += 1
+                stats["categories"][category] = stats["categories"].get(category, 0) + 1
 
             # Apply all redactions on this page
             page.apply_redactions()
 
-        # Save the redacted document
-        doc.save(output_path)
+            # Let MuPDF drop cached fonts and images now and then, so long
+            # documents don't grow its store for the whole run
+            if (page_num + 1) % _STORE_SHRINK_INTERVAL == 0:
+                fitz.TOOLS.store_shrink(100)
+
+        # Save the redacted document, dropping unused objects left behind
+        # by the redactions and compressing streams
+        doc.save(output_path, garbage=4, deflate=True, clean=True)
         doc.close()
 
         return stats
 
 
+# Below this many pages, starting worker processes costs more than it saves
+_PARALLEL_MIN_PAGES = 8
+
+# Pages between releases of MuPDF's font and image caches
+_STORE_SHRINK_INTERVAL = 50
+
+_worker_state = {}
+
+
+def _init_page_worker(input_path: str, categories: dict):
+    detector = SensitiveInfoDetector()
+    for key, category in categories.items():
+        detector.add_category(key, category)
+
+    _worker_state["doc"] = fitz.open(input_path)
+    _worker_state["redactor"] = PDFRedactor(detector)
+
+
+def _scan_page_worker(page_num: int) -> list:
+    page = _worker_state["doc"][page_num]
+    hits = _worker_state["redactor"].scan_page(page)
+    if (page_num + 1) % _STORE_SHRINK_INTERVAL == 0:
+        fitz.TOOLS.store_shrink(100)
+    return [(tuple(rect), category) for rect, category in hits]
+
+
 class WordRedactor:
     """Handles Word document redaction."""
 
@@ -218,75 +518,104 @@ class WordRedactor:
         doc = Document(input_path)
         stats = {"paragraphs": 0, "redactions": 0, "categories": {}}
 
-        # Process paragraphs
-        for para in doc.paragraphs:
-            stats["paragraphs"] += 1
-            self._process_paragraph(para, stats)
-
-        # Process tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for para in cell.paragraphs:
-                        stats["paragraphs"] += 1
-                        self._process_paragraph(para, stats)
-
-        # Process headers and footers
-        for section in doc.sections:
-            for header in [section.header, section.first_page_header, section.even_page_header]:
-                if header:
-                    for para in header.paragraphs:
-                        stats["paragraphs"] += 1
-                        self._process_paragraph(para, stats)
-
-            for footer in [section.footer, section.first_page_footer, section.even_page_footer]:
-                if footer:
-                    for para in footer.paragraphs:
-                        stats["paragraphs"] += 1
-                        self._process_paragraph(para, stats)
+        # Work on the XML directly: every paragraph in the body (including
+        # table cells, nested tables and text boxes) and in each header and
+        # footer part, without building python-docx proxy objects
+        roots = [doc.element.body]
+        for rel in doc.part.rels.values():
+            if rel.reltype in (RT.HEADER, RT.FOOTER) and rel.target_part.element not in roots:
+                roots.append(rel.target_part.element)
+
+        paragraphs = [p for root in roots for p in root.xpath(".//w:p")]
+        stats["paragraphs"] = len(paragraphs)
+
+        # Each paragraph's text-bearing nodes, in the order Word renders them
+        nodes = [p.xpath(_TEXT_NODES) for p in paragraphs]
+        texts = ["".join(_node_text(node) for node in para_nodes) for para_nodes in nodes]
+
+        # Run the detector once over every paragraph, then bucket the matches
+        # back by offset
+        offsets = []
+        offset = 0
+        for text in texts:
+            offsets.append(offset)
+            offset += len(text) + len(_TEXT_SEPARATOR)
+
+        by_paragraph = {}
+        for start, end, matched_text, category in self.detector.find_sensitive_text(_TEXT_SEPARATOR.join(texts)):
+            index = bisect_right(offsets, start) - 1
+            base = offsets[index]
+            by_paragraph.setdefault(index, []).append((start - base, end - base, matched_text, category))
+
+        for index, matches in by_paragraph.items():
+            self._process_paragraph(nodes[index], texts[index], matches, stats)
 
         doc.save(output_path)
         return stats
 
-    def _process_paragraph(self, para, stats: dict):
-        """Process a single paragraph for redaction."""
-        full_text = para.text
-        if not full_text:
-            return
-
-        matches = self.detector.find_sensitive_text(full_text)
-        if not matches:
-            return
-
-        # Build new text with redactions
-        new_text = list(full_text)
+    def _process_paragraph(self, nodes: list, full_text: str, matches: list, stats: dict):
+        """Apply a paragraph's matches, given as offsets into full_text, to its text nodes."""
+        # Build new text with redactions; matches are sorted and
+        # non-overlapping, so splice slices together. Each match is replaced
+        # char for char, so offsets are unchanged
+        pieces = []
+        cursor = 0
         for start, end, matched_text, category in matches:
-            for i in range(start, end):
-                new_text[i] = "█"
+            pieces.append(full_text[cursor:start])
+            pieces.append("█" * (end - start))
+            cursor = end
             stats["redactions"] += 1
             stats["categories"][category] = stats["categories"].get(category, 0) + 1
+        pieces.append(full_text[cursor:])
 
-        new_text = "".join(new_text)
+        new_text = "".join(pieces)
 
-        # Clear existing runs and add new text
-        # Preserve formatting from first run if available
-        if para.runs:
-            first_run = para.runs[0]
-            font_name = first_run.font.name
-            font_size = first_run.font.size
-            bold = first_run.font.bold
-            italic = first_run.font.italic
+        node_starts = []
+        offset = 0
+        for node in nodes:
+            node_starts.append(offset)
+            offset += len(_node_text(node))
+        node_starts.append(offset)
 
-            # Clear all runs
-            for run in para.runs:
-                run.text = ""
+        # Rewrite only the w:t nodes a match touches; run properties are
+        # siblings of them, so formatting is left alone
+        touched = set()
+        for start, end, matched_text, category in matches:
+            index = bisect_right(node_starts, start) - 1
+            while index < len(nodes) and node_starts[index] < end:
+                touched.add(index)
+                index += 1
 
-            # Set new text on first run
-            para.runs[0].text = new_text
-            para.runs[0].font.name = font_name
-            para.runs[0].font.size = font_size
-            para.runs[0].font.bold = bold
-            para.runs[0].font.italic = italic
+        for index in touched:
+            node = nodes[index]
+            if node.tag == qn("w:t"):
+                node.text = new_text[node_starts[index]:node_starts[index + 1]]
+
+
+# Run-level nodes that make up a paragraph's visible text, for runs directly
+# in the paragraph or inside a hyperlink (as python-docx's para.text reads it)
+_TEXT_NODES = " | ".join(
+    f"./{parent}/*[self::w:t or self::w:tab or self::w:ptab or self::w:br or self::w:cr or self::w:noBreakHyphen]"
+    for parent in ("w:r", "w:hyperlink/w:r")
+)
+
+
+def _node_text(node) -> str:
+    """Text a run-level node contributes to its paragraph."""
+    tag = node.tag
+    if tag == qn("w:t"):
+        return node.text or ""
+    if tag in (qn("w:tab"), qn("w:ptab")):
+        return "\t"
+    if tag == qn("w:noBreakHyphen"):
+        return "-"
+    if tag == qn("w:br") and node.get(qn("w:type")) not in (None, "textWrapping"):
+        return ""  # Page and column breaks carry no text
+    return "\n"
+
+
+# Entries kept in each of the GUI's preview caches
+_PREVIEW_CACHE_SIZE = 8
 
 
 class RedactionToolGUI:
@@ -302,6 +631,15 @@ class RedactionToolGUI:
         self.loaded_file = None
         self.category_vars = {}
 
+        # Preview caches, most recently used last. Extracted text is keyed by
+        # (path, mtime); matches additionally by the detector configuration,
+        # so toggling a category re-runs detection but not extraction
+        self._text_cache = OrderedDict()
+        self._match_cache = OrderedDict()
+
+        # Engine used to extract PDF text for previews; redaction always uses PyMuPDF
+        self.preview_backend = tk.StringVar(value="pymupdf")
+
         self._setup_styles()
         self._create_widgets()
         self._initialize_categories()
@@ -330,6 +668,16 @@ class RedactionToolGUI:
         ttk.Button(file_frame, text="Browse...", command=self._browse_file).grid(row=0, column=1)
         ttk.Button(file_frame, text="Clear", command=self._clear_file).grid(row=0, column=2, padx=(5, 0))
 
+        # Preview engine selection
+        backend_frame = ttk.Frame(file_frame)
+        backend_frame.grid(row=1, column=0, columnspan=3, sticky="w", pady=(5, 0))
+
+        ttk.Label(backend_frame, text="PDF preview engine:").grid(row=0, column=0, padx=(0, 10))
+        ttk.Radiobutton(backend_frame, text="PyMuPDF", variable=self.preview_backend,
+                        value="pymupdf").grid(row=0, column=1, padx=(0, 10))
+        ttk.Radiobutton(backend_frame, text="PDFium", variable=self.preview_backend, value="pdfium",
+                        state="normal" if pypdfium2 is not None else "disabled").grid(row=0, column=2)
+
         file_frame.columnconfigure(0, weight=1)
 
         # Categories section
@@ -437,8 +785,7 @@ class RedactionToolGUI:
             else:
                 self.detector.remove_category("Custom")
         else:
-            if key in self.detector.categories:
-                self.detector.categories[key].enabled = enabled
+            self.detector.set_enabled(key, enabled)
 
     def _update_custom_terms(self):
         """Update the custom terms category."""
@@ -490,11 +837,29 @@ class RedactionToolGUI:
         self.preview_text.delete("1.0", tk.END)
         self.preview_text.config(state="disabled")
 
+    def _extract_pdf_text_pdfium(self, filepath: str) -> str:
+        """Extract PDF text for preview with PDFium."""
+        pdf = pypdfium2.PdfDocument(filepath)
+        parts = []
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                # PDFium ends lines with CRLF; match PyMuPDF's output
+                parts.append(textpage.get_text_bounded().replace("\r\n", "\n") + "\n")
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+        return "".join(parts)
+
     def _extract_text(self, filepath: str) -> str:
         """Extract text from a document for preview."""
         ext = Path(filepath).suffix.lower()
 
         if ext == ".pdf":
+            if self.preview_backend.get() == "pdfium" and pypdfium2 is not None:
+                return self._extract_pdf_text_pdfium(filepath)
+
             doc = fitz.open(filepath)
             text = ""
             for page in doc:
@@ -512,6 +877,28 @@ class RedactionToolGUI:
         else:
             raise ValueError(f"Unsupported file type: {ext}")
 
+    def _detector_signature(self) -> tuple:
+        """Hashable snapshot of the detector configuration, for the match cache."""
+        return tuple(
+            (key, cat.enabled, tuple(cat.patterns), tuple(cat.examples))
+            for key, cat in self.detector.categories.items()
+        )
+
+    @staticmethod
+    def _cache_get(cache: OrderedDict, key):
+        """Look up a preview cache entry, marking it most recently used."""
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    @staticmethod
+    def _cache_put(cache: OrderedDict, key, value):
+        """Store a preview cache entry, evicting the least recently used."""
+        cache[key] = value
+        if len(cache) > _PREVIEW_CACHE_SIZE:
+            cache.popitem(last=False)
+
     def _preview_redactions(self):
         """Preview what will be redacted."""
         if not self.loaded_file:
@@ -522,23 +909,30 @@ class RedactionToolGUI:
             self.status_label.config(text="Analyzing document...")
             self.root.update()
 
-            text = self._extract_text(self.loaded_file)
-            matches = self.detector.find_sensitive_text(text)
+            text_key = (self.loaded_file, os.path.getmtime(self.loaded_file), self.preview_backend.get())
+            text = self._cache_get(self._text_cache, text_key)
+            if text is None:
+                text = self._extract_text(self.loaded_file)
+                self._cache_put(self._text_cache, text_key, text)
+
+            match_key = (text_key, self._detector_signature())
+            matches = self._cache_get(self._match_cache, match_key)
+            if matches is None:
+                matches = self.detector.find_sensitive_text(text)
+                self._cache_put(self._match_cache, match_key, matches)
 
             self.preview_text.config(state="normal")
             self.preview_text.delete("1.0", tk.END)
 
-            # Show preview with highlighted matches
-            last_end = 0
+            # Show preview with highlighted matches: insert the text once, then
+            # tag every match range in a single Tcl call
+            self.preview_text.insert(tk.END, text)
+            ranges = []
             for start, end, matched_text, category in matches:
-                # Insert text before match
-                self.preview_text.insert(tk.END, text[last_end:start])
-                # Insert matched text with highlight
-                self.preview_text.insert(tk.END, matched_text, "match")
-                last_end = end
-
-            # Insert remaining text
-            self.preview_text.insert(tk.END, text[last_end:])
+                ranges.append(f"1.0 + {start} chars")
+                ranges.append(f"1.0 + {end} chars")
+            if ranges:
+                self.preview_text.tag_add("match", *ranges)
 
             self.preview_text.config(state="disabled")
 
@@ -582,7 +976,7 @@ class RedactionToolGUI:
             self.root.update()
 
             if ext == ".pdf":
-                redactor = PDFRedactor(self.detector)
+                redactor = PDFRedactor(self.detector, workers=os.cpu_count() or 1)
             else:
                 redactor = WordRedactor(self.detector)
 
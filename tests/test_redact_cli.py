@@ -0,0 +1,80 @@
+import itertools
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import redact_cli
+
+
+def _entries():
+    return [(pattern, category.name)
+            for category in redact_cli.PREDEFINED_CATEGORIES.values()
+            for pattern in category.patterns]
+
+
+class UnicodeTextTests(unittest.TestCase):
+    TEXT = "Call (555)\xa0123-4567 or 555\xa0123\xa04567 on January\xa015, 2024"
+
+    def test_nbsp_separated_numbers_match(self):
+        detector = redact_cli.SensitiveInfoDetector()
+        for key, category in redact_cli.PREDEFINED_CATEGORIES.items():
+            detector.add_category(key, category)
+        found = [(m[2], m[3]) for m in detector.find_sensitive_text(self.TEXT)]
+        self.assertEqual(found, [
+            ("(555)\xa0123-4567", "Phone Numbers"),
+            ("555\xa0123\xa04567", "Phone Numbers"),
+            ("January\xa015, 2024", "Dates"),
+        ])
+
+    def test_hyperscan_matches_re(self):
+        with_hs = redact_cli._PatternScanner(_entries())
+        re_only = redact_cli._PatternScanner(_entries(), use_hyperscan=False)
+        for text in [self.TEXT, "é555-123-4567", "a\x1c555 123 4567", "İ 123-45-6789 x@y.org"]:
+            self.assertEqual(with_hs.scan(text), re_only.scan(text), text)
+
+
+class HyperscanTests(unittest.TestCase):
+    TOKENS = ["555-123-4567", "(555) 123-4567", "5551234567", "4111 1111 1111 1111", "4111111111111111",
+              "john@x.com", "123-45-6789", "123456789", "01/15/2024", "January 15, 2024"]
+    SEPARATORS = ["", " ", "-", ".", "\n", "@", "("]
+
+    def test_hyperscan_matches_re_on_token_pairs(self):
+        # Hyperscan reports every match end, not re's leftmost-first ones, so
+        # adjacent tokens are where the two engines would disagree
+        with_hs = redact_cli._PatternScanner(_entries())
+        re_only = redact_cli._PatternScanner(_entries(), use_hyperscan=False)
+        for a, b in itertools.product(self.TOKENS, repeat=2):
+            for separator in self.SEPARATORS:
+                text = a + separator + b
+                self.assertEqual(with_hs.scan(text), re_only.scan(text), text)
+
+
+class CustomTermTests(unittest.TestCase):
+    # İ is the one character str.lower() lengthens
+    TEXT = "john@doe.comJohn Doe\u0130 and \u0130stanbul"
+
+    def _found(self):
+        detector = redact_cli.SensitiveInfoDetector()
+        for key, category in redact_cli.PREDEFINED_CATEGORIES.items():
+            detector.add_category(key, category)
+        detector.set_custom_terms(["John Doe", "Doe", "istanbul"])
+        return [(m[0], m[1], m[3]) for m in detector.find_sensitive_text(self.TEXT)]
+
+    def test_nested_term_on_text_that_lowers_longer(self):
+        found = self._found()
+        self.assertIn((17, 20, "Custom Terms"), found)
+        self.assertIn((26, 34, "Custom Terms"), found)
+
+    def test_nested_term_without_pyahocorasick(self):
+        # Terms are then found with str.find
+        with mock.patch.object(redact_cli, "ahocorasick", None):
+            found = self._found()
+        self.assertIn((17, 20, "Custom Terms"), found)
+        self.assertIn((26, 34, "Custom Terms"), found)
+
+
+if __name__ == "__main__":
+    unittest.main()
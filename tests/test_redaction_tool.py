@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import redaction_tool
+
+
+def _detector():
+    detector = redaction_tool.SensitiveInfoDetector()
+    for key, category in redaction_tool.PREDEFINED_CATEGORIES.items():
+        detector.add_category(key, category)
+    return detector
+
+
+class AsciiCategoryTests(unittest.TestCase):
+    def test_nbsp_separated_numbers_match(self):
+        text = "Call (555)\xa0123-4567 on January\xa015, 2024; card 4111\xa01111\xa01111\xa01111"
+        found = [(m[2], m[3]) for m in _detector().find_sensitive_text(text)]
+        self.assertEqual(found, [
+            ("(555)\xa0123-4567", "Phone Numbers"),
+            ("January\xa015, 2024", "Dates"),
+            ("4111\xa01111\xa01111\xa01111", "Credit Card Numbers"),
+        ])
+
+    def test_no_match_right_after_non_ascii_letter(self):
+        matches = _detector().find_sensitive_text("İ5551234567 ſ01/15/2024")
+        self.assertEqual(matches, [])
+
+    def test_non_latin_digits_are_not_numbers(self):
+        matches = _detector().find_sensitive_text("٥٥٥-١٢٣-٤٥٦٧")
+        self.assertEqual(matches, [])
+
+
+class ExactExampleTests(unittest.TestCase):
+    # İ is the one character str.lower() lengthens
+    TEXT = "john@doe.comJohn Doe\u0130 and \u0130stanbul"
+
+    def _found(self):
+        detector = _detector()
+        detector.add_category("Custom", redaction_tool.SensitiveCategory(
+            name="Custom Terms", description="", examples=["John Doe", "Doe", "istanbul"], use_exact_match=True))
+        return [(m[0], m[1], m[3]) for m in detector.find_sensitive_text(self.TEXT)]
+
+    def test_nested_example_on_text_that_lowers_longer(self):
+        found = self._found()
+        self.assertIn((17, 20, "Custom Terms"), found)
+        self.assertIn((26, 34, "Custom Terms"), found)
+
+    def test_nested_example_without_pyahocorasick(self):
+        # Examples are then found with str.find
+        with mock.patch.object(redaction_tool, "ahocorasick", None):
+            found = self._found()
+        self.assertIn((17, 20, "Custom Terms"), found)
+        self.assertIn((26, 34, "Custom Terms"), found)
+
+
+if __name__ == "__main__":
+    unittest.main()
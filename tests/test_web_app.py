@@ -0,0 +1,165 @@
+import io
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import web_app
+from docx import Document
+
+
+def _detector(custom_terms=(), **kwargs):
+    detector = web_app.SensitiveInfoDetector(**kwargs)
+    for key, category in web_app.PREDEFINED_CATEGORIES.items():
+        detector.add_category(key, category)
+    detector.set_custom_terms(list(custom_terms))
+    return detector
+
+
+class UnicodeTextTests(unittest.TestCase):
+    TEXT = "Call (555)\xa0123-4567 or 555\xa0123\xa04567 on January\xa015, 2024"
+
+    def test_nbsp_separated_numbers_match(self):
+        found = [(m[2], m[3]) for m in _detector().find_sensitive_text(self.TEXT)]
+        self.assertEqual(found, [
+            ("(555)\xa0123-4567", "Phone Numbers"),
+            ("555\xa0123\xa04567", "Phone Numbers"),
+            ("January\xa015, 2024", "Dates"),
+        ])
+
+    def test_hyperscan_matches_re(self):
+        texts = [self.TEXT, "é555-123-4567", "a\x1c555 123 4567", "İ 123-45-6789 x@y.org"]
+        with_hs = _detector()
+        re_only = _detector(use_hyperscan=False)
+        for text in texts:
+            self.assertEqual(with_hs.find_sensitive_text(text), re_only.find_sensitive_text(text), text)
+
+
+class HyperscanTests(unittest.TestCase):
+    TOKENS = ["555-123-4567", "(555) 123-4567", "5551234567", "4111 1111 1111 1111", "4111111111111111",
+              "john@x.com", "123-45-6789", "123456789", "01/15/2024", "January 15, 2024", "synergy", "John Doe"]
+    SEPARATORS = ["", " ", "-", ".", "\n", "@", "("]
+
+    def test_hyperscan_matches_re_on_token_pairs(self):
+        # Hyperscan reports every match end, not re's leftmost-first ones, so
+        # adjacent tokens are where the two engines would disagree
+        with_hs = _detector(["John Doe", "Doe"])
+        re_only = _detector(["John Doe", "Doe"], use_hyperscan=False)
+        for a, b in itertools.product(self.TOKENS, repeat=2):
+            for separator in self.SEPARATORS:
+                text = a + separator + b
+                self.assertEqual(with_hs.find_sensitive_text(text), re_only.find_sensitive_text(text), text)
+
+
+class ThreadTests(unittest.TestCase):
+    def test_shared_detector_scans_from_many_threads(self):
+        # get_detector hands every request thread the same cached detector
+        detector = web_app.get_detector(tuple(web_app.PREDEFINED_CATEGORIES), ("John Doe",))
+        text = "John Doe, 555-123-4567, 123-45-6789, x@y.org, synergy. " * 2000
+        expected = detector.find_sensitive_text(text)
+        results, errors = [], []
+
+        def scan():
+            try:
+                for _ in range(5):
+                    results.append(detector.find_sensitive_text(text) == expected)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=scan) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [True] * 40)
+
+    def test_overlapping_requests(self):
+        # render.yaml serves requests from 8 gthread threads
+        def upload(index):
+            document = Document()
+            for _ in range(200):
+                document.add_paragraph(f"Request {index}: John Doe, 555-123-4567, 123-45-6789, x@y.org, synergy.")
+            buf = io.BytesIO()
+            document.save(buf)
+            return buf.getvalue()
+
+        uploads = [upload(index) for index in range(8)]
+        form = {'categories': list(web_app.PREDEFINED_CATEGORIES), 'custom_terms': 'John Doe'}
+        results, errors = [], []
+
+        def post(index):
+            client = web_app.app.test_client()
+            try:
+                for route, field in (('/preview', 'file'), ('/redact-batch', 'files')):
+                    data = dict(form, **{field: (io.BytesIO(uploads[index]), f'request{index}.docx')})
+                    results.append(client.post(route, data=data, content_type='multipart/form-data').get_json())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=post, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for result in results:
+            if 'download_id' in result:
+                shutil.rmtree(web_app.OUTPUT_FOLDER / result['download_id'].split('/')[0])
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(r.get('total', r.get('total_redactions')) for r in results), [1000] * 16)
+
+
+class CustomTermTests(unittest.TestCase):
+    # İ is the one character str.lower() lengthens
+    TEXT = "john@doe.comJohn Doe\u0130 and \u0130stanbul"
+
+    def test_nested_term_on_text_that_lowers_longer(self):
+        for use_hyperscan in (True, False):
+            detector = _detector(["doe", "John Doe", "istanbul"], use_hyperscan=use_hyperscan)
+            found = [(m[0], m[1], m[3]) for m in detector.find_sensitive_text(self.TEXT)]
+            self.assertIn((17, 20, "Custom Terms"), found)
+            self.assertIn((26, 34, "Custom Terms"), found)
+
+    def test_nested_term_without_pyahocorasick(self):
+        # Literal words are then found with str.find
+        with mock.patch.object(web_app, "ahocorasick", None):
+            detector = _detector(["doe", "John Doe", "istanbul"], use_hyperscan=False)
+            found = [(m[0], m[1], m[3]) for m in detector.find_sensitive_text(self.TEXT)]
+        self.assertIsNone(detector._literal_automaton)
+        self.assertIn((17, 20, "Custom Terms"), found)
+        self.assertIn((26, 34, "Custom Terms"), found)
+
+
+class DownloadTests(unittest.TestCase):
+    def test_ids_outside_output_folder_are_refused(self):
+        outside = Path(tempfile.mkdtemp(dir=web_app.OUTPUT_FOLDER.parent))
+        (outside / 'secret.txt').write_text('secret')
+        self.addCleanup(shutil.rmtree, outside)
+        client = web_app.app.test_client()
+        for prefix in ('..', '%2e%2e', str(outside.parent)):
+            for name in (f'{outside.name}.zip', f'{outside.name}/secret.txt'):
+                url = f'/download/{prefix}/{name}'
+                self.assertEqual(client.get(url, follow_redirects=True).status_code, 404, url)
+
+    def test_batch_downloads(self):
+        batch_id = str(uuid.uuid4())
+        folder = web_app.OUTPUT_FOLDER / batch_id
+        folder.mkdir()
+        (folder / 'a_redacted.docx').write_bytes(b'docx')
+        self.addCleanup(shutil.rmtree, folder)
+        client = web_app.app.test_client()
+        self.assertEqual(client.get(f'/download/{batch_id}/a_redacted.docx').data, b'docx')
+        self.assertEqual(client.get(f'/download/{batch_id}.zip').status_code, 200)
+        self.assertEqual(client.get(f'/download/{batch_id}').status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
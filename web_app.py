@@ -3,23 +3,54 @@
 Document Redaction Tool - Web Interface
 """
 
+import io
 import os
 import re
+import sys
 import uuid
+import bisect
+import heapq
+import gzip
+import hashlib
 import shutil
 import tempfile
 import zipfile
 import threading
+import multiprocessing
 import time
+import urllib.parse
 import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import Counter, OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from dataclasses import dataclass, field
-from flask import Flask, render_template_string, request, send_file, jsonify, redirect, url_for
+from flask import Flask, Response, render_template_string, request, send_file, jsonify, redirect, url_for
 import fitz  # PyMuPDF
 from docx import Document
 
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+try:
+    import hyperscan  # Optional: multi-pattern DFA scanner
+except ImportError:
+    hyperscan = None
+
+try:
+    import ahocorasick  # Optional: linear-time literal matching for custom terms
+except ImportError:
+    ahocorasick = None
+
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max for batch uploads
+# Behind a proxy that honours X-Sendfile, downloads are served by the proxy.
+# For nginx, X_ACCEL_REDIRECT names an internal location aliased to OUTPUT_FOLDER
+app.config['X_ACCEL_REDIRECT'] = os.environ.get('X_ACCEL_REDIRECT', '')
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1' or bool(app.config['X_ACCEL_REDIRECT'])
 
 # Use temp directories for Render (ephemeral filesystem)
 UPLOAD_FOLDER = Path(tempfile.gettempdir()) / 'redaction_uploads'
@@ -27,6 +58,11 @@ OUTPUT_FOLDER = Path(tempfile.gettempdir()) / 'redaction_outputs'
 UPLOAD_FOLDER.mkdir(exist_ok=True)
 OUTPUT_FOLDER.mkdir(exist_ok=True)
 
+PREVIEW_HTML_LIMIT = 50000  # Characters of highlighted HTML sent back by /preview
+IN_MEMORY_UPLOAD_LIMIT = 8 * 1024 * 1024  # Batch uploads up to this size skip UPLOAD_FOLDER
+OUTPUT_TTL = 30 * 60  # Seconds before untouched uploads and outputs are deleted
+SWEEP_INTERVAL = 5 * 60
+
 
 @dataclass
 class SensitiveCategory:
@@ -35,13 +71,30 @@ class SensitiveCategory:
     patterns: list = field(default_factory=list)
     examples: list = field(default_factory=list)
     enabled: bool = True
+    compiled: list = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Compiled once per category; invalid patterns are dropped here
+        self.compiled = [re.compile(p, re.IGNORECASE) for p in self.patterns if _is_valid_pattern(p)]
+
+
+def _is_valid_pattern(pattern: str) -> bool:
+    try:
+        re.compile(pattern)
+    except re.error:
+        return False
+    return True
 
 
 PREDEFINED_CATEGORIES = {
     "ssn": SensitiveCategory(
         name="Social Security Numbers",
         description="XXX-XX-XXXX format",
-        patterns=[r'\b\d{3}-\d{2}-\d{4}\b', r'\b\d{9}\b'],
+        patterns=[
+            r'\b\d{3}-\d{2}-\d{4}\b',
+            # Bare 9 digits only in valid SSN ranges, and not inside a dashed number
+            r'(?<!-)\b(?!000|666|9\d\d)\d{3}(?!00)\d{2}(?!0000)\d{4}\b(?!-)'
+        ],
         examples=["123-45-6789"]
     ),
     "email": SensitiveCategory(
@@ -62,7 +115,8 @@ PREDEFINED_CATEGORIES = {
     "creditcard": SensitiveCategory(
         name="Credit Card Numbers",
         description="13-19 digit card numbers",
-        patterns=[r'\b(?:\d{4}[-\s]?){3,4}\d{1,4}\b'],
+        # (?:\d{4}[-\s]?){3,4}\d{1,4} unrolled, so no quantified group nests
+        patterns=[r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?(?:\d{4}[-\s]?)?\d{1,4}\b'],
         examples=["4111-1111-1111-1111"]
     ),
     "date": SensitiveCategory(
@@ -151,39 +205,338 @@ PREDEFINED_CATEGORIES = {
 }
 
 
+@lru_cache(maxsize=None)
+def _hyperscan_db(patterns: tuple):
+    # Pattern ids follow tuple order; cached so requests share compiled databases
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(
+        expressions=[p.encode() for p in patterns],
+        ids=list(range(len(patterns))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(patterns),
+    )
+    return db
+
+
+_hs_local = threading.local()
+
+
+def _hyperscan_scratch(db):
+    # A scratch serves one scan at a time and cached databases are shared by
+    # request threads, so each thread keeps its own per database
+    scratches = getattr(_hs_local, "scratches", None)
+    if scratches is None:
+        scratches = _hs_local.scratches = {}
+    scratch = scratches.get(db)
+    if scratch is None:
+        scratch = scratches[db] = hyperscan.Scratch(db)
+    return scratch
+
+
+@lru_cache(maxsize=None)
+def _hyperscan_supported(pattern: str) -> bool:
+    try:
+        _hyperscan_db((pattern,))
+    except hyperscan.error:
+        return False
+    return True
+
+
+# Most spellings a pattern may expand to before it is left to a regex engine
+_LITERAL_LIMIT = 64
+
+
+def _spellings(items) -> list:
+    # Every string a parsed pattern can match, or None when that set is
+    # unbounded, too large, or needs anything beyond literal characters
+    out = [""]
+    for op, av in items:
+        if op is _sre_parse.LITERAL:
+            options = [chr(av)]
+        elif op is _sre_parse.IN:
+            options = []
+            for item_op, item_av in av:
+                if item_op is _sre_parse.LITERAL:
+                    options.append(chr(item_av))
+                elif item_op is _sre_parse.RANGE:
+                    options.extend(chr(c) for c in range(item_av[0], item_av[1] + 1))
+                else:
+                    return None
+        elif op is _sre_parse.SUBPATTERN:
+            options = _spellings(av[-1])
+        elif op is _sre_parse.BRANCH:
+            options = []
+            for branch in av[1]:
+                expanded = _spellings(branch)
+                if expanded is None:
+                    return None
+                options.extend(expanded)
+        elif op is _sre_parse.MAX_REPEAT and av[1] <= 1:
+            expanded = _spellings(av[2])
+            options = expanded and ([""] + expanded if av[0] == 0 else expanded)
+        else:
+            return None
+        if options is None:
+            return None
+        out = [a + b for a in out for b in options]
+        if len(out) > _LITERAL_LIMIT:
+            return None
+    return out
+
+
+@lru_cache(maxsize=None)
+def _boundary_literals(pattern: str) -> tuple:
+    # Lowercased words a \b...\b pattern matches when it only matches a small
+    # fixed set of them, e.g. \bleverage[ds]?\b; empty when it is a real regex
+    items = list(_sre_parse.parse(pattern))
+    boundary = (_sre_parse.AT, _sre_parse.AT_BOUNDARY)
+    if len(items) < 3 or items[0] != boundary or items[-1] != boundary:
+        return ()
+    words = _spellings(items[1:-1])
+    # The \b checks at scan time assume each word starts and ends on a word character
+    if not words or not all(w and _is_word_char(w[0]) and _is_word_char(w[-1]) for w in words):
+        return ()
+    return tuple(dict.fromkeys(_fold_case(w) for w in words))
+
+
+def _fold_case(text: str) -> str:
+    # str.lower() turns U+0130 into "i" plus a combining dot, the only
+    # character it lengthens; re's IGNORECASE folds it to a plain "i", and so
+    # does this, keeping offsets one-for-one with the text
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = text.replace("\u0130", "i").lower()
+    return lowered
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _group_table(union, labels: list) -> tuple:
+    # Labels by the group index match.lastindex reports, so the match loop
+    # does a tuple index instead of resolving lastgroup's name. The outer
+    # group closes last, so capturing groups inside a pattern don't shift it
+    table = [None] * (union.groups + 1)
+    for i, label in enumerate(labels):
+        table[union.groupindex[f"g{i}"]] = label
+    return tuple(table)
+
+
+# ASCII characters \s matches in str patterns but not in bytes ones; text
+# containing them stays on the str alternation
+_STR_ONLY_SPACE = re.compile("[\x1c-\x1f]")
+
+
+def _ascii_tables_agree(text: str) -> bool:
+    # Byte engines (the bytes twin, Hyperscan) see \s, \b and case the way re
+    # does only on ASCII text without \x1c-\x1f
+    return text.isascii() and not _STR_ONLY_SPACE.search(text)
+
+
+def _match_order(match: tuple) -> tuple:
+    # By start, longest first at a shared start
+    return match[0], match[0] - match[1]
+
+
 class SensitiveInfoDetector:
-    def __init__(self):
+    def __init__(self, use_hyperscan: bool = hyperscan is not None):
         self.categories = {}
         self.custom_terms = []
+        self.use_hyperscan = use_hyperscan
+        self._combined = None
+        self._combined_bytes = None
+        self._group_labels = ()
+        self._hs_db = None
+        self._re_only = None
+        self._literal_words = ()
+        self._literal_automaton = None
+        self._stale = True
 
     def add_category(self, key: str, category: SensitiveCategory):
         self.categories[key] = category
+        self._stale = True
 
     def set_custom_terms(self, terms: list):
         self.custom_terms = [t.strip() for t in terms if t.strip()]
-
-    def find_sensitive_text(self, text: str) -> list:
-        matches = []
-
-        for key, category in self.categories.items():
+        self._stale = True
+
+    def rebuild(self):
+        # One alternation for every enabled pattern, so each text is scanned
+        # once per engine
+        parts = []
+        labels = []
+        hs_patterns = []
+        # Literal words and custom terms for the automaton
+        literal_words = {}
+        for category in self.categories.values():
             if not category.enabled:
                 continue
-            for pattern in category.patterns:
-                try:
-                    for match in re.finditer(pattern, text, re.IGNORECASE):
-                        matches.append((match.start(), match.end(), match.group(), category.name))
-                except re.error:
+            for pattern in (p.pattern for p in category.compiled):
+                # Patterns that only spell out a few words, like \bscalable\b,
+                # are cheaper as literal words with a boundary check
+                words = _boundary_literals(pattern)
+                if words:
+                    for word in words:
+                        literal_words.setdefault(word, []).append((len(word), category.name, True))
                     continue
+                # Hyperscan takes what it can compile; the rest (e.g. lookbehind) stays on re
+                if self.use_hyperscan and _hyperscan_supported(pattern):
+                    hs_patterns.append(pattern)
+                    continue
+                parts.append(f"(?P<g{len(parts)}>{pattern})")
+                labels.append(category.name)
 
+        # Custom terms are plain literals, matched anywhere
         for term in self.custom_terms:
-            escaped = re.escape(term)
-            try:
-                for match in re.finditer(escaped, text, re.IGNORECASE):
-                    matches.append((match.start(), match.end(), match.group(), "Custom Terms"))
-            except re.error:
-                continue
+            lowered = _fold_case(term)
+            literal_words.setdefault(lowered, []).append((len(lowered), "Custom Terms", False))
+
+        self._combined = re.compile("|".join(parts), re.IGNORECASE) if parts else None
+        self._group_labels = _group_table(self._combined, labels) if parts else ()
+        # Bytes twin for ASCII text: sre skips Unicode case folding on bytes,
+        # and byte offsets equal str offsets
+        self._combined_bytes = None
+        if self._combined is not None and self._combined.pattern.isascii():
+            self._combined_bytes = re.compile(self._combined.pattern.encode("ascii"), re.IGNORECASE)
+        self._hs_db = _hyperscan_db(tuple(hs_patterns)) if hs_patterns else None
+        # Hyperscan reports every match rather than re's leftmost-first ones,
+        # so it only narrows down where the twin's alternation of every
+        # pattern is tried. Its \s, \b and case folding are ASCII-only, so
+        # other text goes to the twin outright
+        self._re_only = None
+        if self._hs_db is not None:
+            self._re_only = SensitiveInfoDetector(use_hyperscan=False)
+            self._re_only.categories = self.categories
+            self._re_only.custom_terms = self.custom_terms
+            self._re_only.rebuild()
+
+        # Without pyahocorasick the words are found with str.find instead
+        self._literal_words = tuple((word, tuple(entries)) for word, entries in literal_words.items())
+        self._literal_automaton = None
+        if literal_words and ahocorasick is not None:
+            self._literal_automaton = ahocorasick.Automaton()
+            for word, entries in self._literal_words:
+                self._literal_automaton.add_word(word, entries)
+            self._literal_automaton.make_automaton()
+        self._stale = False
+
+    def _hyperscan_spans(self, buf: bytes) -> list:
+        # Sorted, disjoint [start, end] runs holding every Hyperscan match: a
+        # reported match is the leftmost one for its end offset, so any other
+        # match ending there lies inside it
+        hits = []
+        self._hs_db.scan(buf, match_event_handler=lambda i, start, end, flags, ctx: hits.append((start, end)),
+                         scratch=_hyperscan_scratch(self._hs_db))
+        hits.sort()
+        spans = []
+        for start, end in hits:
+            if spans and start < spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([start, end])
+        return spans
+
+    def _scan_union(self, text: str, buf: bytes) -> list:
+        # What finditer over the twin's alternation returns, trying it only
+        # where a match can start: inside a Hyperscan span, or where one of
+        # the patterns left on re matches. Only called on ASCII text
+        union = self._re_only._combined_bytes
+        labels = self._re_only._group_labels
+        rest = self._combined_bytes
+        spans = self._hyperscan_spans(buf)
+        found = []
+        pos = 0
+        index = 0
+        next_rest = rest.search(buf) if rest is not None else None
+        while True:
+            while index < len(spans) and spans[index][1] <= pos:
+                index += 1
+            if next_rest is not None and next_rest.start() < pos:
+                next_rest = rest.search(buf, pos)
+            limit = next_rest.start() if next_rest is not None else len(buf)
+            m = None
+            if index < len(spans):
+                start, end = spans[index]
+                for at in range(max(pos, start), min(end, limit)):
+                    m = union.match(buf, at)
+                    if m:
+                        break
+                if m is None and limit >= end:
+                    pos = end
+                    continue
+            if m is None:
+                if next_rest is None:
+                    return found
+                # The re pattern matching here makes the alternation match too
+                m = union.match(buf, limit)
+            start, end = m.span()
+            found.append((start, end, text[start:end], labels[m.lastindex]))
+            pos = end
+
+    def _iter_literals(self, lowered: str):
+        # (end offset, entries) for every occurrence of every literal word
+        if self._literal_automaton is not None:
+            for end_index, entries in self._literal_automaton.iter(lowered):
+                yield end_index + 1, entries
+            return
+        for word, entries in self._literal_words:
+            index = lowered.find(word)
+            while index != -1:
+                yield index + len(word), entries
+                index = lowered.find(word, index + 1)
+
+    def _find_literals(self, text: str) -> list:
+        # Every occurrence of every word, overlapping ones included; the
+        # sweep in find_sensitive_text picks among them
+        lowered = _fold_case(text)
+        matches = []
+        size = len(lowered)
+        for end, entries in self._iter_literals(lowered):
+            for length, label, bounded in entries:
+                start = end - length
+                if bounded and ((start and _is_word_char(lowered[start - 1]))
+                                or (end < size and _is_word_char(lowered[end]))):
+                    continue
+                matches.append((start, end, text[start:end], label))
+        return matches
+
+    def signature(self) -> tuple:
+        return (tuple((key, c.enabled, tuple(c.patterns)) for key, c in self.categories.items()),
+                tuple(self.custom_terms))
+
+    def is_empty(self) -> bool:
+        if self._stale:
+            self.rebuild()
+        return self._combined is None and self._hs_db is None and not self._literal_words
+
+    def find_sensitive_text(self, text: str) -> list:
+        if self.is_empty():
+            return []
+        ascii_tables = _ascii_tables_agree(text)
+        if self._re_only is not None and not (ascii_tables and self._re_only._combined_bytes is not None):
+            return self._re_only.find_sensitive_text(text)
+
+        # finditer yields in order already; the literal words are reported by
+        # end, so only their (usually short) list is sorted before the merge
+        streams = []
+        if self._hs_db is not None:
+            streams.append(self._scan_union(text, text.encode("ascii")))
+        elif self._combined_bytes is not None and ascii_tables:
+            found = []
+            for m in self._combined_bytes.finditer(text.encode("ascii")):
+                start, end = m.span()
+                found.append((start, end, text[start:end], self._group_labels[m.lastindex]))
+            streams.append(found)
+        elif self._combined is not None:
+            streams.append([(m.start(), m.end(), m.group(), self._group_labels[m.lastindex])
+                            for m in self._combined.finditer(text)])
+        if self._literal_words:
+            streams.append(sorted(self._find_literals(text), key=_match_order))
+        # finditer alone never overlaps, so the sweep would keep everything
+        if not self._literal_words:
+            return streams[0]
+        matches = streams[0] if len(streams) == 1 else heapq.merge(*streams, key=_match_order)
 
-        matches.sort(key=lambda x: (x[0], -(x[1] - x[0])))
         filtered = []
         last_end = -1
         for match in matches:
@@ -193,56 +546,212 @@ class SensitiveInfoDetector:
         return filtered
 
 
-def redact_pdf(input_path: str, output_path: str, detector: SensitiveInfoDetector) -> dict:
-    doc = fitz.open(input_path)
-    stats = {"pages": 0, "redactions": 0, "categories": {}}
+@lru_cache(maxsize=64)
+def get_detector(categories: tuple, custom_terms: tuple) -> SensitiveInfoDetector:
+    detector = SensitiveInfoDetector()
+    for cat_key in categories:
+        detector.add_category(cat_key, PREDEFINED_CATEGORIES[cat_key])
+    detector.set_custom_terms(list(custom_terms))
+    # Built now rather than lazily: cached detectors are shared by request threads
+    detector.rebuild()
+    return detector
 
-    for page in doc:
-        stats["pages"] += 1
-        text_dict = page.get_text("dict")
 
-        for block in text_dict.get("blocks", []):
-            if block.get("type") != 0:
-                continue
-            for line in block.get("lines", []):
-                for span in line.get("spans", []):
-                    text = span.get("text", "")
-                    if not text:
-                        continue
-                    matches = detector.find_sensitive_text(text)
-                    for start, end, matched_text, category in matches:
-                        instances = page.search_for(matched_text)
-                        for inst in instances:
-                            page.add_redact_annot(inst, fill=(0, 0, 0))
-                            stats["redactions"] += 1
-                            stats["categories"][category] = stats["categories"].get(category, 0) + 1
-        page.apply_redactions()
+def detector_from_form(form) -> SensitiveInfoDetector:
+    # Categories keep PREDEFINED_CATEGORIES order, which sets the alternation's
+    # priority, so the same selection always maps to the same detector
+    selected = set(form.getlist('categories'))
+    categories = tuple(key for key in PREDEFINED_CATEGORIES if key in selected)
+    custom_terms = tuple(sorted({t.strip() for t in form.get('custom_terms', '').split('\n') if t.strip()}))
+    return get_detector(categories, custom_terms)
 
-    doc.save(output_path)
+
+# Worker processes for multi-file batches
+BATCH_WORKERS = int(os.environ.get('REDACT_WORKERS', max(1, (os.cpu_count() or 1) - 1)))
+# Request threads, the sweeper and the keep-alive thread may hold locks, so
+# workers are never forked from this process: they start from a clean
+# interpreter and rebuild the detector through get_detector
+WORKER_CONTEXT = multiprocessing.get_context('forkserver' if sys.platform.startswith('linux') else 'spawn')
+
+_batch_pool = None
+_batch_pool_lock = threading.Lock()
+
+
+def batch_pool() -> ProcessPoolExecutor:
+    # Created on first use (after gunicorn forks its workers) and kept, so
+    # batches don't each pay for starting workers and rebuilding detectors
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            _batch_pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS, mp_context=WORKER_CONTEXT)
+        return _batch_pool
+
+
+def discard_batch_pool(pool: ProcessPoolExecutor):
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is pool:
+            _batch_pool = None
+    pool.shutdown(wait=False)
+
+
+def redact_file(input_path: str, output_path: str, detector: SensitiveInfoDetector, workers: int = 1,
+                data: bytes = None) -> dict:
+    if Path(input_path).suffix.lower() == '.pdf':
+        return redact_pdf(input_path, output_path, detector, workers=workers, data=data)
+    return redact_docx(input_path, output_path, detector, data=data)
+
+
+def _redact_file_worker(input_path: str, output_path: str, categories: tuple, custom_terms: tuple) -> dict:
+    return redact_file(input_path, output_path, get_detector(categories, custom_terms))
+
+
+# Preview matches by (text digest, detector signature), so previewing the same
+# document again with the same settings skips detection
+_MATCH_CACHE_SIZE = 16
+_match_cache = OrderedDict()
+_match_cache_lock = threading.Lock()
+
+
+def cached_matches(detector: SensitiveInfoDetector, text: str) -> list:
+    if detector.is_empty():
+        return []
+    digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    key = (digest, detector.signature())
+    with _match_cache_lock:
+        matches = _match_cache.get(key)
+        if matches is not None:
+            _match_cache.move_to_end(key)
+            return matches
+
+    matches = detector.find_sensitive_text(text)
+    with _match_cache_lock:
+        _match_cache[key] = matches
+        if len(_match_cache) > _MATCH_CACHE_SIZE:
+            _match_cache.popitem(last=False)
+    return matches
+
+
+# Joins PDF lines and DOCX paragraphs for a single detection pass. No
+# pattern or custom term can match across a NUL (\s covers \x1c-\x1f, so
+# those won't do)
+_TEXT_SEPARATOR = "\x00"
+
+
+# rawdict's defaults without TEXT_PRESERVE_IMAGES: image blocks are skipped
+# anyway, and decoding their pixels dominates extraction on scanned pages
+_RAWDICT_FLAGS = fitz.TEXTFLAGS_RAWDICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def _scan_pdf_page(page, detector: SensitiveInfoDetector) -> tuple:
+    if detector.is_empty():
+        return [], []
+
+    # Flatten the page's rawdict into one string with a parallel list of
+    # glyph boxes, so each match maps straight to its glyphs
+    pieces = []
+    boxes = []
+    for block in page.get_text("rawdict", flags=_RAWDICT_FLAGS)["blocks"]:
+        if block["type"] != 0:
+            continue
+        for line in block["lines"]:
+            for span in line["spans"]:
+                for char in span["chars"]:
+                    pieces.append(char["c"])
+                    boxes.extend([char["bbox"]] * len(char["c"]))
+            pieces.append(_TEXT_SEPARATOR)
+            boxes.append(None)
+
+    # Pages without a text layer (scans) or with only blank lines can't match
+    text = "".join(pieces)
+    if not text.replace(_TEXT_SEPARATOR, " ").strip():
+        return [], []
+
+    rects = []
+    found = []
+    for start, end, matched_text, category in detector.find_sensitive_text(text):
+        rect = fitz.Rect(boxes[start])
+        for bbox in boxes[start + 1:end]:
+            rect |= bbox
+        rects.append(rect)
+        found.append(category)
+    return rects, found
+
+
+# Below this many pages, starting worker processes costs more than it saves
+_PARALLEL_MIN_PAGES = 8
+
+_worker_state = {}
+
+
+def _init_page_worker(input_path: str, categories: tuple, custom_terms: tuple, data: bytes = None):
+    # The detector's compiled matchers don't pickle, so workers look it up by key
+    _worker_state["doc"] = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(input_path)
+    _worker_state["detector"] = get_detector(categories, custom_terms)
+
+
+def _scan_page_worker(page_num: int) -> tuple:
+    rects, found = _scan_pdf_page(_worker_state["doc"][page_num], _worker_state["detector"])
+    return [tuple(rect) for rect in rects], found
+
+
+def redact_pdf(input_path: str, output_path: str, detector: SensitiveInfoDetector, workers: int = 1,
+               data: bytes = None) -> dict:
+    # With data, the upload is redacted from memory (as in extract_text)
+    doc = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(input_path)
+    stats = {"pages": 0, "redactions": 0, "categories": Counter()}
+
+    # Pages are scanned in worker processes for long documents; annotations
+    # are applied here since the document can't be shared
+    executor = None
+    if workers > 1 and doc.page_count >= _PARALLEL_MIN_PAGES:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=WORKER_CONTEXT,
+                                       initializer=_init_page_worker,
+                                       initargs=(input_path, tuple(detector.categories),
+                                                 tuple(detector.custom_terms), data))
+        scanned = executor.map(_scan_page_worker, range(doc.page_count),
+                               chunksize=max(1, doc.page_count // (workers * 4)))
+    else:
+        scanned = (_scan_pdf_page(page, detector) for page in doc)
+
+    try:
+        for page, (rects, found) in zip(doc, scanned):
+            stats["pages"] += 1
+            for rect in rects:
+                page.add_redact_annot(rect, fill=(0, 0, 0))
+            stats["redactions"] += len(found)
+            stats["categories"].update(found)
+            # Only text is detected, so vector line art under a box is left alone
+            page.apply_redactions(graphics=fitz.PDF_REDACT_LINE_ART_NONE)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    # Garbage collection drops the pre-redaction content streams, which
+    # would otherwise stay in the file unreferenced but readable
+    doc.save(output_path, garbage=4, deflate=True, clean=True)
     doc.close()
+    stats["categories"] = dict(stats["categories"])
     return stats
 
 
-def redact_docx(input_path: str, output_path: str, detector: SensitiveInfoDetector) -> dict:
-    doc = Document(input_path)
-    stats = {"paragraphs": 0, "redactions": 0, "categories": {}}
+def redact_docx(input_path: str, output_path: str, detector: SensitiveInfoDetector, data: bytes = None) -> dict:
+    doc = Document(io.BytesIO(data)) if data is not None else Document(input_path)
+    stats = {"paragraphs": 0, "redactions": 0, "categories": Counter()}
 
-    def process_paragraph(para):
-        full_text = para.text
-        if not full_text:
-            return
-        matches = detector.find_sensitive_text(full_text)
-        if not matches:
-            return
-
-        new_text = list(full_text)
+    def process_paragraph(para, full_text, matches):
+        # Matches are sorted and non-overlapping: splice blocks in by slices
+        parts = []
+        cursor = 0
         for start, end, matched_text, category in matches:
-            for i in range(start, end):
-                new_text[i] = "█"
-            stats["redactions"] += 1
-            stats["categories"][category] = stats["categories"].get(category, 0) + 1
-
-        new_text = "".join(new_text)
+            parts.append(full_text[cursor:start])
+            parts.append("█" * (end - start))
+            cursor = end
+        parts.append(full_text[cursor:])
+        stats["redactions"] += len(matches)
+        stats["categories"].update(m[3] for m in matches)
+
+        new_text = "".join(parts)
         if para.runs:
             first_run = para.runs[0]
             font_name = first_run.font.name
@@ -257,32 +766,60 @@ def redact_docx(input_path: str, output_path: str, detector: SensitiveInfoDetect
             para.runs[0].font.bold = bold
             para.runs[0].font.italic = italic
 
-    for para in doc.paragraphs:
-        stats["paragraphs"] += 1
-        process_paragraph(para)
-
+    paragraphs = list(doc.paragraphs)
     for table in doc.tables:
         for row in table.rows:
             for cell in row.cells:
-                for para in cell.paragraphs:
-                    stats["paragraphs"] += 1
-                    process_paragraph(para)
+                paragraphs.extend(cell.paragraphs)
+    stats["paragraphs"] = len(paragraphs)
+
+    # Merged cells yield the same paragraph more than once; redact it once
+    unique = {}
+    for para in paragraphs:
+        unique.setdefault(para._p, para)
+    paragraphs = list(unique.values())
+
+    if detector.is_empty():
+        doc.save(output_path)
+        stats["categories"] = {}
+        return stats
+
+    # One detection pass over every paragraph, then map hits back by offset.
+    # Blank paragraphs can't match, so they are left out of the pass
+    texts = [para.text for para in paragraphs]
+    kept = [i for i, text in enumerate(texts) if text.strip()]
+    paragraphs = [paragraphs[i] for i in kept]
+    texts = [texts[i] for i in kept]
+    offsets = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text) + len(_TEXT_SEPARATOR)
+
+    by_paragraph = {}
+    for start, end, matched_text, category in detector.find_sensitive_text(_TEXT_SEPARATOR.join(texts)):
+        index = bisect.bisect_right(offsets, start) - 1
+        base = offsets[index]
+        by_paragraph.setdefault(index, []).append((start - base, end - base, matched_text, category))
+
+    for index, matches in by_paragraph.items():
+        process_paragraph(paragraphs[index], texts[index], matches)
 
     doc.save(output_path)
+    stats["categories"] = dict(stats["categories"])
     return stats
 
 
-def extract_text(file_path: str) -> str:
+def extract_text(file_path: str, data: bytes = None) -> str:
+    # With data, file_path only supplies the extension and nothing touches disk
     ext = Path(file_path).suffix.lower()
     if ext == ".pdf":
-        doc = fitz.open(file_path)
-        text = ""
-        for page in doc:
-            text += page.get_text() + "\n"
+        doc = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(file_path)
+        text = "".join(page.get_text("text", sort=False) + "\n" for page in doc)
         doc.close()
         return text
     elif ext == ".docx":
-        doc = Document(file_path)
+        doc = Document(io.BytesIO(data) if data is not None else file_path)
         return "\n".join([para.text for para in doc.paragraphs])
     return ""
 
@@ -882,6 +1419,18 @@ HTML_TEMPLATE = '''
         const previewResults = document.getElementById('previewResults');
 
         let selectedFiles = [];
+        // name/size keys of selectedFiles, for constant-time duplicate checks
+        const selectedKeys = new Set();
+        const fileKey = (file) => file.name + '/' + file.size;
+
+        // The server rejects larger requests outright, so don't send them
+        const maxUploadBytes = {{ max_upload }};
+        function tooLarge(files) {
+            const total = files.reduce((sum, f) => sum + f.size, 0);
+            if (total <= maxUploadBytes) return false;
+            alert(`Error: uploads are limited to ${Math.floor(maxUploadBytes / (1024 * 1024))} MB per request`);
+            return true;
+        }
 
         // File upload handling
         uploadZone.addEventListener('click', () => fileInput.click());
@@ -909,21 +1458,50 @@ HTML_TEMPLATE = '''
             }
         });
 
+        // One click listener for every row's remove button
+        fileList.addEventListener('click', (e) => {
+            const button = e.target.closest('.remove-btn');
+            if (button) removeFile(button.parentElement);
+        });
+
+        function fileRow(file) {
+            const row = document.createElement('div');
+            row.className = 'file-item';
+            row.dataset.key = fileKey(file);
+            const label = document.createElement('span');
+            label.textContent = `📎 ${file.name} (${(file.size / 1024).toFixed(1)} KB)`;
+            const button = document.createElement('button');
+            button.type = 'button';
+            button.className = 'remove-btn';
+            button.textContent = '✕';
+            row.append(label, button);
+            return row;
+        }
+
         function addFiles(files) {
+            // Only the new rows are built, and appended in one go
+            const rows = document.createDocumentFragment();
             for (const file of files) {
                 const ext = file.name.split('.').pop().toLowerCase();
                 if (['pdf', 'docx'].includes(ext)) {
                     // Check for duplicates
-                    if (!selectedFiles.some(f => f.name === file.name && f.size === file.size)) {
+                    const key = fileKey(file);
+                    if (!selectedKeys.has(key)) {
+                        selectedKeys.add(key);
                         selectedFiles.push(file);
+                        rows.appendChild(fileRow(file));
                     }
                 }
             }
+            fileList.appendChild(rows);
             updateFileList();
         }
 
-        function removeFile(index) {
-            selectedFiles.splice(index, 1);
+        function removeFile(row) {
+            const key = row.dataset.key;
+            selectedKeys.delete(key);
+            selectedFiles.splice(selectedFiles.findIndex(f => fileKey(f) === key), 1);
+            row.remove();
             updateFileList();
         }
 
@@ -938,18 +1516,12 @@ HTML_TEMPLATE = '''
             fileList.classList.add('visible');
             previewBtn.disabled = false;
             redactBtn.disabled = false;
-
-            fileList.innerHTML = selectedFiles.map((file, index) => `
-                <div class="file-item">
-                    <span>📎 ${file.name} (${(file.size / 1024).toFixed(1)} KB)</span>
-                    <button type="button" class="remove-btn" onclick="removeFile(${index})">✕</button>
-                </div>
-            `).join('');
         }
 
         // Preview (first file only)
         previewBtn.addEventListener('click', async () => {
             if (selectedFiles.length === 0) return;
+            if (tooLarge(selectedFiles.slice(0, 1))) return;
 
             const formData = new FormData();
             formData.append('file', selectedFiles[0]);
@@ -999,6 +1571,7 @@ HTML_TEMPLATE = '''
             e.preventDefault();
 
             if (selectedFiles.length === 0) return;
+            if (tooLarge(selectedFiles)) return;
 
             loading.classList.add('visible');
             results.classList.remove('visible');
@@ -1077,9 +1650,28 @@ HTML_TEMPLATE = '''
 '''
 
 
+# The page only depends on PREDEFINED_CATEGORIES and the upload limit, so it is
+# rendered and compressed once
+with app.app_context():
+    INDEX_HTML = render_template_string(HTML_TEMPLATE, categories=PREDEFINED_CATEGORIES,
+                                        max_upload=app.config['MAX_CONTENT_LENGTH'])
+INDEX_GZIP = gzip.compress(INDEX_HTML.encode('utf-8'), compresslevel=9, mtime=0)
+INDEX_ETAG = hashlib.blake2b(INDEX_HTML.encode('utf-8'), digest_size=8).hexdigest()
+
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE, categories=PREDEFINED_CATEGORIES)
+    if request.accept_encodings['gzip']:
+        response = Response(INDEX_GZIP, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(INDEX_ETAG + '-gzip')
+    else:
+        response = Response(INDEX_HTML, mimetype='text/html')
+        response.set_etag(INDEX_ETAG)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
 
 
 @app.route('/preview', methods=['POST'])
@@ -1095,46 +1687,36 @@ def preview():
     if ext not in ['.pdf', '.docx']:
         return jsonify({'error': 'Unsupported file type. Please upload a PDF or Word document.'})
 
-    file_id = str(uuid.uuid4())
-    input_path = UPLOAD_FOLDER / f"{file_id}{ext}"
-    file.save(str(input_path))
-
-    detector = SensitiveInfoDetector()
-    categories = request.form.getlist('categories')
-    for cat_key in categories:
-        if cat_key in PREDEFINED_CATEGORIES:
-            detector.add_category(cat_key, PREDEFINED_CATEGORIES[cat_key])
+    data = file.read()
 
-    custom_terms = request.form.get('custom_terms', '').strip().split('\n')
-    detector.set_custom_terms(custom_terms)
+    detector = detector_from_form(request.form)
 
     try:
-        text = extract_text(str(input_path))
-        matches = detector.find_sensitive_text(text)
+        text = extract_text(file.filename, data)
+        matches = cached_matches(detector, text)
 
-        preview_html = ""
+        # Every source character yields at least one character of HTML, so
+        # text past the limit can never reach the truncated preview
+        parts = []
         last_end = 0
         for start, end, matched_text, category in matches:
-            preview_html += escape_html(text[last_end:start])
-            preview_html += f'<span class="match">{escape_html(matched_text)}</span>'
+            if start >= PREVIEW_HTML_LIMIT:
+                break
+            parts.append(escape_html(text[last_end:start]))
+            parts.append(f'<span class="match">{escape_html(matched_text)}</span>')
             last_end = end
-        preview_html += escape_html(text[last_end:])
+        parts.append(escape_html(text[last_end:max(last_end, PREVIEW_HTML_LIMIT)]))
+        preview_html = "".join(parts)
 
-        category_counts = {}
-        for _, _, _, category in matches:
-            category_counts[category] = category_counts.get(category, 0) + 1
-
-        os.remove(input_path)
+        category_counts = Counter(m[3] for m in matches)
 
         return jsonify({
             'total': len(matches),
-            'categories': category_counts,
-            'preview_html': preview_html[:50000]
+            'categories': dict(category_counts),
+            'preview_html': preview_html[:PREVIEW_HTML_LIMIT]
         })
 
     except Exception as e:
-        if input_path.exists():
-            os.remove(input_path)
         return jsonify({'error': str(e)})
 
 
@@ -1148,14 +1730,7 @@ def redact_batch():
         return jsonify({'error': 'No files selected'})
 
     # Setup detector
-    detector = SensitiveInfoDetector()
-    categories = request.form.getlist('categories')
-    for cat_key in categories:
-        if cat_key in PREDEFINED_CATEGORIES:
-            detector.add_category(cat_key, PREDEFINED_CATEGORIES[cat_key])
-
-    custom_terms = request.form.get('custom_terms', '').strip().split('\n')
-    detector.set_custom_terms(custom_terms)
+    detector = detector_from_form(request.form)
 
     # Process each file
     batch_id = str(uuid.uuid4())
@@ -1164,54 +1739,74 @@ def redact_batch():
 
     results = []
     total_redactions = 0
-    total_categories = {}
+    total_categories = Counter()
 
-    for file in files:
+    files = [file for file in files if Path(file.filename).suffix.lower() in ['.pdf', '.docx']]
+    # Files are independent, so a batch is spread over processes (each file
+    # then scanned serially); a lone PDF spreads its pages instead
+    parallel = len(files) > 1 and BATCH_WORKERS > 1
+
+    jobs = []
+    for index, file in enumerate(files):
         ext = Path(file.filename).suffix.lower()
-        if ext not in ['.pdf', '.docx']:
-            continue
 
-        file_id = str(uuid.uuid4())
-        input_path = UPLOAD_FOLDER / f"{file_id}{ext}"
-        file.save(str(input_path))
+        # batch_id is already unique, so file names only need the position
+        input_path = UPLOAD_FOLDER / f"{batch_id}_{index}{ext}"
+        # Worker processes need a path; otherwise small uploads stay in memory
+        in_memory = not parallel and upload_size(file) <= IN_MEMORY_UPLOAD_LIMIT
+        if not in_memory:
+            save_upload(file, input_path)
 
         original_name = Path(file.filename).stem
         output_filename = f"{original_name}_redacted{ext}"
-        output_path = batch_folder / output_filename
-
+        jobs.append((file.filename, input_path, output_filename, batch_folder / output_filename,
+                     file if in_memory else None))
+
+    pending = None
+    if parallel:
+        args = [(str(input_path), str(output_path), tuple(detector.categories), tuple(detector.custom_terms))
+                for _, input_path, _, output_path, _ in jobs]
+        pool = batch_pool()
         try:
-            if ext == '.pdf':
-                stats = redact_pdf(str(input_path), str(output_path), detector)
+            pending = [pool.submit(_redact_file_worker, *job_args) for job_args in args]
+        except BrokenProcessPool:
+            # A worker that died in an earlier batch breaks the whole pool
+            discard_batch_pool(pool)
+            pool = batch_pool()
+            pending = [pool.submit(_redact_file_worker, *job_args) for job_args in args]
+
+    for index, (original_name, input_path, output_filename, output_path, upload) in enumerate(jobs):
+        try:
+            if pending is not None:
+                stats = pending[index].result()
             else:
-                stats = redact_docx(str(input_path), str(output_path), detector)
+                stats = redact_file(str(input_path), str(output_path), detector,
+                                    workers=min(os.cpu_count() or 1, 4),
+                                    data=upload.read() if upload is not None else None)
 
             results.append({
-                'original_name': file.filename,
+                'original_name': original_name,
                 'output_name': output_filename,
                 'redactions': stats['redactions'],
                 'categories': stats['categories']
             })
 
             total_redactions += stats['redactions']
-            for cat, count in stats['categories'].items():
-                total_categories[cat] = total_categories.get(cat, 0) + count
+            total_categories.update(stats['categories'])
 
-            os.remove(input_path)
+            input_path.unlink(missing_ok=True)
 
         except Exception as e:
-            if input_path.exists():
-                os.remove(input_path)
+            if isinstance(e, BrokenProcessPool):
+                discard_batch_pool(pool)
+            input_path.unlink(missing_ok=True)
             results.append({
-                'original_name': file.filename,
+                'original_name': original_name,
                 'error': str(e)
             })
 
-    # If multiple files, create ZIP
+    # If multiple files, /download zips the batch folder on the fly
     if len(results) > 1:
-        zip_path = OUTPUT_FOLDER / f"{batch_id}.zip"
-        with zipfile.ZipFile(zip_path, 'w') as zf:
-            for file in batch_folder.iterdir():
-                zf.write(file, file.name)
         download_id = f"{batch_id}.zip"
     else:
         # Single file - get its path
@@ -1225,35 +1820,105 @@ def redact_batch():
         'download_id': download_id,
         'file_count': len(results),
         'total_redactions': total_redactions,
-        'total_categories': total_categories,
+        'total_categories': dict(total_categories),
         'files': results
     })
 
 
+@app.errorhandler(413)
+def upload_too_large(e):
+    # Werkzeug raises this from the Content-Length header, before the body is read
+    limit = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({'error': f'Upload too large. The limit is {limit} MB per request.'}), 413
+
+
+def resolve_download(download_id: str):
+    # Download ids are relative to OUTPUT_FOLDER; None for anything that
+    # resolves outside it (.., absolute paths, symlinks) or to the folder itself
+    root = OUTPUT_FOLDER.resolve()
+    path = (OUTPUT_FOLDER / download_id).resolve()
+    return path if root in path.parents else None
+
+
 @app.route('/download/<path:download_id>')
 def download(download_id):
     # Handle ZIP downloads
     if download_id.endswith('.zip'):
-        zip_path = OUTPUT_FOLDER / download_id
-        if zip_path.exists():
-            return send_file(
-                str(zip_path),
-                as_attachment=True,
-                download_name='redacted_documents.zip'
+        batch_folder = resolve_download(download_id[:-len('.zip')])
+        if batch_folder is not None and batch_folder.is_dir():
+            os.utime(batch_folder)  # Downloading restarts the TTL
+            return Response(
+                stream_zip(batch_folder),
+                mimetype='application/zip',
+                headers={'Content-Disposition': 'attachment; filename=redacted_documents.zip'}
             )
     else:
         # Handle single file downloads
-        file_path = OUTPUT_FOLDER / download_id
-        if file_path.exists():
-            return send_file(
+        file_path = resolve_download(download_id)
+        if file_path is not None and file_path.is_file():
+            os.utime(file_path.parent)
+            response = send_file(
                 str(file_path),
                 as_attachment=True,
-                download_name=file_path.name
+                download_name=file_path.name,
+                conditional=True
             )
+            if app.config['X_ACCEL_REDIRECT'] and 'X-Sendfile' in response.headers:
+                del response.headers['X-Sendfile']
+                response.headers['X-Accel-Redirect'] = (
+                    app.config['X_ACCEL_REDIRECT'].rstrip('/') + '/' + urllib.parse.quote(download_id))
+            return response
 
     return "File not found", 404
 
 
+class _ZipSink(io.RawIOBase):
+    """Unseekable sink that hands zipfile's output back in pieces"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_zip(folder):
+    # PDFs and DOCX files are compressed already, so entries are stored.
+    # The sink can't seek, so zipfile writes sizes after each entry and the
+    # archive never touches the disk
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zf:
+        for path in sorted(folder.iterdir()):
+            info = zipfile.ZipInfo.from_file(path, path.name)
+            with open(path, 'rb') as src, zf.open(info, 'w') as dest:
+                while block := src.read(1024 * 1024):
+                    dest.write(block)
+                    yield sink.drain()
+    yield sink.drain()
+
+
+def upload_size(file) -> int:
+    # Werkzeug spools uploads to memory or a temp file, both seekable
+    size = file.stream.seek(0, os.SEEK_END)
+    file.stream.seek(0)
+    return size
+
+
+def save_upload(file, path):
+    # 1 MB chunks instead of FileStorage.save's 16 KB
+    with open(path, 'wb') as f:
+        shutil.copyfileobj(file.stream, f, length=1024 * 1024)
+
+
 def escape_html(text):
     return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
 
@@ -1280,8 +1945,45 @@ def keep_alive():
             print(f"Keep-alive ping failed: {e}")
 
 
+def sweep_folders(max_age: float = OUTPUT_TTL):
+    # Entries are judged by mtime: batch folders by their last output written
+    # (or download), uploads by when they were saved
+    cutoff = time.time() - max_age
+    for folder in (UPLOAD_FOLDER, OUTPUT_FOLDER):
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat(follow_symlinks=False).st_mtime >= cutoff:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    else:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass  # Removed by a request or another worker's sweeper
+
+
+def sweeper():
+    """Background thread that deletes expired uploads and redacted outputs"""
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        try:
+            sweep_folders()
+        except Exception as e:
+            print(f"Cleanup sweep failed: {e}")
+
+
+# Worker processes and the forkserver (as __mp_main__) import this module
+# too; only the server itself runs background threads
+SERVER_PROCESS = __name__ != '__mp_main__' and multiprocessing.parent_process() is None
+
+if SERVER_PROCESS:
+    sweeper_thread = threading.Thread(target=sweeper, daemon=True)
+    sweeper_thread.start()
+
+
 # Start keep-alive thread on Render
-if os.environ.get('RENDER_EXTERNAL_URL'):
+if SERVER_PROCESS and os.environ.get('RENDER_EXTERNAL_URL'):
     keep_alive_thread = threading.Thread(target=keep_alive, daemon=True)
     keep_alive_thread.start()
     print("Keep-alive thread started")